@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
+from app.core.tracing import start_trace
 from app.models.schemas import AnswerRequest, AnswerResponse
 from app.services.answer_service import generate_answer, stream_generate_answer
 
@@ -26,7 +27,14 @@ router = APIRouter()
 
 
 @router.post("/answer", name="answer")
-async def answer_router(endpoint_request: AnswerRequest, request: Request):
+async def answer_router(endpoint_request: AnswerRequest, request: Request, response: Response):
     if endpoint_request.stream:
         return await stream_generate_answer(endpoint_request, request)
-    return await generate_answer(endpoint_request, request)
+
+    trace = start_trace(detailed=endpoint_request.include_trace)
+    answer = await generate_answer(endpoint_request, request)
+    response.headers["Server-Timing"] = trace.server_timing()
+    if endpoint_request.include_trace:
+        # A copy: the same response object may be shared with coalesced requests.
+        answer = answer.model_copy(update={"trace": trace.to_dict()})
+    return answer
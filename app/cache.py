@@ -1,49 +1,305 @@
-from redis.asyncio import from_url
+from redis.asyncio import BlockingConnectionPool, Redis
+from app.core.codec import CacheCodec, SchemaMismatch
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import REDIS_COMMAND_SECONDS, REDIS_CONNECTIONS_IN_USE, REDIS_POOL_WAIT_SECONDS, record_cache
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import asyncio
 import json
+import re
+import time
+import unicodedata
+import uuid
 
-redis = from_url(settings.redis_url, decode_responses=True)
 
-async def get_cached_answer(query: str):
+class _InstrumentedPool(BlockingConnectionPool):
+    """
+    Bounded connection pool: when all connections are busy, callers wait up to
+    redis_pool_timeout instead of opening more. Records the wait for a connection and how
+    long each command or pipeline holds it.
+    """
+
+    def __init__(self, *args, pool_name: str = "redis", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_name = pool_name
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        connection = await super().get_connection(*args, **kwargs)
+        acquired = time.perf_counter()
+        REDIS_POOL_WAIT_SECONDS.labels(self.pool_name).observe(acquired - start)
+        REDIS_CONNECTIONS_IN_USE.labels(self.pool_name).inc()
+        connection._acquired_at = acquired
+        return connection
+
+    async def release(self, connection):
+        acquired = getattr(connection, "_acquired_at", None)
+        if acquired is not None:
+            connection._acquired_at = None
+            REDIS_COMMAND_SECONDS.labels(self.pool_name).observe(time.perf_counter() - acquired)
+            REDIS_CONNECTIONS_IN_USE.labels(self.pool_name).dec()
+        await super().release(connection)
+
+
+def redis_client(pool_name: str, decode_responses: bool, **overrides) -> Redis:
+    """A client with its own bounded pool; `pool_name` labels its metrics."""
+    options = {
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_pool_timeout,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_connect_timeout,
+        **overrides,
+    }
+    pool = _InstrumentedPool.from_url(
+        settings.redis_url, pool_name=pool_name, decode_responses=decode_responses, **options
+    )
+    return Redis(connection_pool=pool)
+
+
+redis = redis_client("text", decode_responses=True)
+# Same server, raw bytes in and out, for caches that store binary payloads.
+redis_bytes = redis_client("bytes", decode_responses=False)
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU map with an optional per-entry TTL.
+    Bounded by entry count and, if `max_bytes` is set, by the sizes callers pass to set().
+    """
+
+    def __init__(self, max_items: int, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at, _ = item
+        if expires_at and expires_at <= time.monotonic():
+            self.pop(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.pop(key)  # would evict everything else; drop any older copy instead
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self.pop(key)
+        self._data[key] = (value, time.monotonic() + ttl if ttl else 0.0, size)
+        self.bytes += size
+        while len(self._data) > self.max_items or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.bytes -= evicted
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        self.bytes -= item[2]
+        return item[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStats:
+    """
+    Hit/miss counters for one named cache.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        self.hits += 1
+        record_cache(self.name, True)
+
+    def miss(self) -> None:
+        self.misses += 1
+        record_cache(self.name, False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4)}
+
+
+_cache_stats: Dict[str, CacheStats] = {}
+
+
+def get_cache_stats(name: str) -> CacheStats:
+    """Return the shared counters for the cache called `name`, creating them on first use."""
+    stats = _cache_stats.get(name)
+    if stats is None:
+        stats = _cache_stats[name] = CacheStats(name)
+    return stats
+
+
+def cache_stats_snapshot() -> Dict[str, dict]:
+    """Hit/miss counters of every cache in this process."""
+    return {name: stats.snapshot() for name, stats in _cache_stats.items()}
+
+
+# Bump when AnswerResponse changes in a way old cached answers cannot be read as.
+ANSWER_SCHEMA_VERSION = 1
+
+answer_codec = CacheCodec(
+    schema=ANSWER_SCHEMA_VERSION,
+    serializer=settings.cache_serializer,
+    compression=settings.cache_compression,
+    threshold=settings.cache_compression_threshold,
+    level=settings.cache_compression_level,
+)
+
+# In-process tier in front of the Redis answer cache, for the hottest queries. Entries are
+# dropped on a shorter TTL and when another worker publishes a newer answer for the query.
+answer_local = LRUCache(
+    max_items=settings.answer_cache_local_max_items,
+    ttl=settings.answer_cache_local_ttl_seconds,
+    max_bytes=settings.answer_cache_local_max_bytes,
+)
+# Identifies this worker's own invalidation messages so it does not drop what it just cached.
+_WORKER_ID = uuid.uuid4().hex
+
+
+def answer_cache_key(query: str) -> str:
+    """
+    Answer-cache key for a message: NFC-normalized with whitespace collapsed, the same
+    normalization request coalescing uses, so messages that differ only in spacing share
+    one entry. Case is kept, since it can change the answer ("US" vs "us").
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", query)).strip()
+
+
+def get_local_answer(query: str):
+    """Answer from the in-process tier, or None. Counted as the "answer_local" cache."""
+    if not settings.answer_cache_local_enabled:
+        return None
+    stats = get_cache_stats("answer_local")
+    value = answer_local.get(answer_cache_key(query))
+    if value is None:
+        stats.miss()
+        return None
+    stats.hit()
+    return value
+
+
+def decode_cached_answer(query: str, value: Optional[bytes], pttl: Optional[int] = None):
+    """
+    Turn the raw Redis answer-cache value for `query` (fetched by any means) into a dict,
+    counting the Redis-tier hit or miss and filling the in-process tier on a hit.
+    `pttl` is the key's remaining Redis TTL in milliseconds; the local copy never outlives it.
+    """
+    stats = get_cache_stats("answer")
     try:
-        value = await redis.get(query)
         if value:
+            result = answer_codec.decode(value)
             logger.info(f"[Cache] Cache hit for query: {query}")
-            return json.loads(value)
-        return None
+            stats.hit()
+            if settings.answer_cache_local_enabled:
+                ttl = settings.answer_cache_local_ttl_seconds
+                if pttl is not None and pttl >= 0:
+                    ttl = min(ttl, pttl / 1000)
+                answer_local.set(answer_cache_key(query), result, ttl=ttl, size=len(value))
+            return result
+    except SchemaMismatch as e:
+        logger.info(f"[Cache] Ignoring cached answer from another schema: {e}")
+    except Exception as e:
+        logger.error(f"[Cache] Error decoding cached answer: {e}")
+    stats.miss()
+    return None
+
+
+async def get_cached_answer(query: str):
+    cached = get_local_answer(query)
+    if cached is not None:
+        return cached
+    key = answer_cache_key(query)
+    try:
+        async with redis_bytes.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, pttl = await pipe.execute()
     except Exception as e:
         logger.error(f"[Cache] Error reading from cache: {e}")
         return None
+    return decode_cached_answer(query, value, pttl)
 
 async def set_cached_answer(query: str, value: dict, ttl: int = 3600):
+    key = answer_cache_key(query)
     try:
-        # Convert HttpUrl to str recursively before caching
-        def serialize(obj):
-            if isinstance(obj, dict):
-                return {k: serialize(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [serialize(item) for item in obj]
-            elif hasattr(obj, "model_dump"):
-                return serialize(obj.model_dump())
-            elif hasattr(obj, "__str__"):
-                return str(obj)
-            return obj
-
-        value = serialize(value)
-
-        await redis.setex(query, ttl, json.dumps(value))
+        # HttpUrl and other non-JSON types become strings; None, numbers and booleans are kept.
+        payload = answer_codec.encode(value)
+
+        if settings.answer_cache_local_enabled:
+            # Keep what a Redis read would return, not the caller's objects.
+            local = answer_codec.decode(payload)
+            answer_local.set(key, local, ttl=min(ttl, settings.answer_cache_local_ttl_seconds), size=len(payload))
+            async with redis_bytes.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, payload)
+                # Other workers may hold an older answer for this query in their local tier.
+                pipe.publish(settings.answer_cache_invalidation_channel, json.dumps({"origin": _WORKER_ID, "key": key}))
+                await pipe.execute()
+        else:
+            await redis_bytes.setex(key, ttl, payload)
         logger.info(f"[Cache] Cached response for query: {query}")
     except Exception as e:
         logger.error(f"[Cache] Error writing to cache: {e}")
 
 
-async def rate_limit(key: str):
+async def invalidate_cached_answer(query: str) -> None:
+    """Delete the cached answer for `query` from Redis and from every worker's local tier."""
+    key = answer_cache_key(query)
+    answer_local.pop(key)
     try:
-        current = await redis.incr(key)
-        if current == 1:
-            await redis.expire(key, 60)
-        return current
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            pipe.publish(settings.answer_cache_invalidation_channel, json.dumps({"origin": _WORKER_ID, "key": key}))
+            await pipe.execute()
     except Exception as e:
-        logger.error(f"[Cache] Error in rate limiting: {e}")
-        return 0
+        logger.error(f"[Cache] Error invalidating cached answer: {e}")
+
+
+async def listen_for_invalidations() -> None:
+    """
+    Drop local answers that other workers replaced or invalidated, as announced on the
+    invalidation channel. Runs for the app's lifetime on its own connection. After a
+    disconnect the local tier is cleared, since messages may have been missed.
+    """
+    channel = settings.answer_cache_invalidation_channel
+    # One long-lived connection that idles between messages, so no read timeout.
+    client = redis_client("pubsub", decode_responses=True, max_connections=1, socket_timeout=None)
+    while True:
+        try:
+            async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(channel)
+                logger.info(f"[Cache] Listening for answer invalidations on {channel}.")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("origin") != _WORKER_ID:
+                        answer_local.pop(event.get("key"))
+        except asyncio.CancelledError:
+            await client.aclose()
+            raise
+        except Exception as e:
+            logger.error(f"[Cache] Invalidation listener failed, clearing local answers and retrying: {e}")
+            answer_local.clear()
+            await asyncio.sleep(5)
@@ -0,0 +1,130 @@
+# app/core/codec.py
+
+import importlib
+import importlib.util
+import json
+import struct
+from functools import lru_cache
+from typing import Any, Union
+from app.core.logger import logger
+
+# Encoded values start with MAGIC and a header: codec version, schema version, serializer
+# and compression. JSON text cannot start with a NUL byte, so values written before the
+# codec existed (plain JSON) are still recognized and read.
+MAGIC = b"\x00AG"
+CODEC_VERSION = 1
+_HEADER = struct.Struct(">3sBBBB")
+
+SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zstd": 1, "lz4": 2}
+
+# Packages providing each option; none of them is required.
+_PACKAGES = {"orjson": ("orjson",), "msgpack": ("ormsgpack", "msgpack"), "zstd": ("zstandard",), "lz4": ("lz4",)}
+
+
+class SchemaMismatch(ValueError):
+    """The value was written for a different schema version and should be treated as a miss."""
+
+
+def _installed(option: str) -> bool:
+    packages = _PACKAGES.get(option)
+    return packages is None or any(importlib.util.find_spec(package) is not None for package in packages)
+
+
+@lru_cache(maxsize=None)
+def _module(name: str):
+    """Import an optional package once; None if it is not installed."""
+    if importlib.util.find_spec(name.split(".")[0]) is None:
+        return None
+    return importlib.import_module(name)
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Fallback for types the serializers do not know: pydantic models, then anything with str()."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+def _dumps(serializer: str, value: Any) -> bytes:
+    if serializer == "orjson":
+        return _module("orjson").dumps(value, default=_to_jsonable)
+    if serializer == "msgpack":
+        if _module("ormsgpack") is not None:
+            return _module("ormsgpack").packb(value, default=_to_jsonable)
+        return _module("msgpack").packb(value, default=_to_jsonable, use_bin_type=True)
+    return json.dumps(value, default=_to_jsonable, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(serializer: str, data: bytes) -> Any:
+    if serializer == "msgpack":
+        if _module("ormsgpack") is not None:
+            return _module("ormsgpack").unpackb(data)
+        return _module("msgpack").unpackb(data, raw=False)
+    # orjson output is plain JSON, so either parser reads both.
+    if _module("orjson") is not None:
+        return _module("orjson").loads(data)
+    return json.loads(data)
+
+
+def _compress(compression: str, data: bytes, level: int) -> bytes:
+    if compression == "zstd":
+        return _module("zstandard").ZstdCompressor(level=level).compress(data)
+    return _module("lz4.frame").compress(data)
+
+
+def _decompress(compression: str, data: bytes) -> bytes:
+    if compression == "zstd":
+        return _module("zstandard").ZstdDecompressor().decompress(data)
+    return _module("lz4.frame").decompress(data)
+
+
+class CacheCodec:
+    """
+    Compact, versioned encoding for cached values.
+
+    Values are serialized with orjson or msgpack (stdlib json if neither is installed) and
+    compressed with zstd or lz4 once they exceed `threshold` bytes. Reading dispatches on
+    the header, so entries written under other settings stay readable. Bump `schema` when
+    the cached value's shape changes incompatibly; older entries then read as misses.
+    """
+
+    def __init__(self, schema: int, serializer: str = "orjson", compression: str = "zstd", threshold: int = 1024, level: int = 3):
+        self.schema = schema
+        self.serializer = self._resolve(serializer, SERIALIZERS, "json")
+        self.compression = self._resolve(compression, COMPRESSIONS, "none")
+        self.threshold = threshold
+        self.level = level
+        self._serializer_names = {v: k for k, v in SERIALIZERS.items()}
+        self._compression_names = {v: k for k, v in COMPRESSIONS.items()}
+
+    @staticmethod
+    def _resolve(option: str, known: dict, fallback: str) -> str:
+        option = option.lower()
+        if option not in known:
+            raise ValueError(f"Unsupported cache codec option: {option}")
+        if not _installed(option):
+            logger.warning(f"[Codec] '{option}' requested but its package is not installed; using '{fallback}'.")
+            return fallback
+        return option
+
+    def encode(self, value: Any) -> bytes:
+        body = _dumps(self.serializer, value)
+        compression = "none"
+        if self.compression != "none" and len(body) > self.threshold:
+            body, compression = _compress(self.compression, body, self.level), self.compression
+        header = _HEADER.pack(MAGIC, CODEC_VERSION, self.schema, SERIALIZERS[self.serializer], COMPRESSIONS[compression])
+        return header + body
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data.startswith(MAGIC):
+            return json.loads(data)  # written before the codec: plain JSON text
+        magic, version, schema, serializer, compression = _HEADER.unpack_from(data)
+        if version != CODEC_VERSION or schema != self.schema:
+            raise SchemaMismatch(f"codec version {version}, schema {schema}; expected {CODEC_VERSION}, {self.schema}")
+        body = data[_HEADER.size:]
+        if compression:
+            body = _decompress(self._compression_names[compression], body)
+        return _loads(self._serializer_names[serializer], body)
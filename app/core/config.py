@@ -47,6 +47,12 @@ class Settings(BaseSettings):
     ollama_base_url: HttpUrl = Field(default="http://localhost:11434", env="OLLAMA_BASE_URL")
     ollama_model: str = Field(default="llama3", env="OLLAMA_MODEL")
 
+    # --- Upstream Endpoint Settings ---
+    # Override to point the app at a proxy or at local stand-ins (see benchmarks/fake_services.py).
+    openai_base_url: str = Field(default="https://api.openai.com/v1", env="OPENAI_BASE_URL")
+    serper_base_url: str = Field(default="https://google.serper.dev", env="SERPER_BASE_URL")
+    brave_base_url: str = Field(default="https://api.search.brave.com", env="BRAVE_BASE_URL")
+
     # --- Resolved Model Names ---
     answer_model: Optional[str] = None
     rephrase_model: Optional[str] = None
@@ -60,17 +66,121 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, env="REDIS_PORT")
     redis_password: str = Field(default="", env="REDIS_PASSWORD")
     redis_use_upstash: bool = Field(default=False, env="REDIS_USE_UPSTASH")
+    # Per client (text and bytes); callers wait up to redis_pool_timeout for a free connection.
+    redis_max_connections: int = Field(default=50, env="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout: float = Field(default=2.0, env="REDIS_POOL_TIMEOUT")
+    redis_socket_timeout: float = Field(default=5.0, env="REDIS_SOCKET_TIMEOUT")
+    redis_connect_timeout: float = Field(default=2.0, env="REDIS_CONNECT_TIMEOUT")
 
     # --- Rate Limiting Settings ---
+    # Default limit per client IP. RATE_LIMIT_RULES overrides it per route or API key, as JSON:
+    # {"route:/answer": "20/60", "key:<api key>": "600/60"} (requests / seconds).
     requests_per_minute: int = Field(default=30, env="REQUESTS_PER_MINUTE")
+    rate_limit_rules: Dict[str, str] = Field(default={}, env="RATE_LIMIT_RULES")
+    rate_limit_api_key_header: str = Field(default="X-API-Key", env="RATE_LIMIT_API_KEY_HEADER")
+    rate_limit_lease_size: int = Field(default=5, env="RATE_LIMIT_LEASE_SIZE")
+    rate_limit_lease_ttl_ms: int = Field(default=1000, env="RATE_LIMIT_LEASE_TTL_MS")
 
     # --- Cache Settings ---
     cache_ttl_seconds: int = Field(default=3600, env="CACHE_TTL_SECONDS")
+    # In-process tier in front of the Redis answer cache.
+    answer_cache_local_enabled: bool = Field(default=True, env="ANSWER_CACHE_LOCAL_ENABLED")
+    answer_cache_local_max_items: int = Field(default=500, env="ANSWER_CACHE_LOCAL_MAX_ITEMS")
+    answer_cache_local_max_bytes: int = Field(default=32 * 1024 * 1024, env="ANSWER_CACHE_LOCAL_MAX_BYTES")
+    answer_cache_local_ttl_seconds: int = Field(default=60, env="ANSWER_CACHE_LOCAL_TTL_SECONDS")
+    answer_cache_invalidation_channel: str = Field(default="askgenie:answer-invalidations", env="ANSWER_CACHE_INVALIDATION_CHANNEL")
+    # Encoding of cached answers in Redis; falls back to json / none if the package is missing.
+    cache_serializer: str = Field(default="orjson", env="CACHE_SERIALIZER")  # json | orjson | msgpack
+    cache_compression: str = Field(default="zstd", env="CACHE_COMPRESSION")  # none | zstd | lz4
+    cache_compression_threshold: int = Field(default=1024, env="CACHE_COMPRESSION_THRESHOLD")
+    cache_compression_level: int = Field(default=3, env="CACHE_COMPRESSION_LEVEL")
+
+    # --- Chunking Settings ---
+    # Defaults for requests that do not set text_chunk_size / text_chunk_overlap. Sizes, both
+    # here and in requests, are measured in chunk_unit.
+    chunk_size: int = Field(default=1000, env="CHUNK_SIZE")
+    chunk_overlap: int = Field(default=200, env="CHUNK_OVERLAP")
+    chunk_unit: str = Field(default="chars", env="CHUNK_UNIT")  # chars | tokens
+    chunk_tokenizer_encoding: str = Field(default="cl100k_base", env="CHUNK_TOKENIZER_ENCODING")
+
+    # --- Incremental Pipeline Settings ---
+    pipeline_incremental_enabled: bool = Field(default=True, env="PIPELINE_INCREMENTAL_ENABLED")
+    # Stop collecting pages once one raises the mean top-k cosine score by less than this.
+    pipeline_min_gain: float = Field(default=0.01, env="PIPELINE_MIN_GAIN")
+    pipeline_min_pages: int = Field(default=2, env="PIPELINE_MIN_PAGES")
+
+    # --- Search Router Settings ---
+    search_router_enabled: bool = Field(default=True, env="SEARCH_ROUTER_ENABLED")
+    search_hedge_delay_ms: int = Field(default=800, env="SEARCH_HEDGE_DELAY_MS")
+    search_router_ewma_alpha: float = Field(default=0.2, env="SEARCH_ROUTER_EWMA_ALPHA")
+    search_router_error_threshold: float = Field(default=0.5, env="SEARCH_ROUTER_ERROR_THRESHOLD")
+    search_router_latency_ratio: float = Field(default=2.0, env="SEARCH_ROUTER_LATENCY_RATIO")
+    search_router_retry_seconds: int = Field(default=30, env="SEARCH_ROUTER_RETRY_SECONDS")
+
+    # --- Search Cache Settings ---
+    search_cache_enabled: bool = Field(default=True, env="SEARCH_CACHE_ENABLED")
+    search_cache_ttl_seconds: int = Field(default=600, env="SEARCH_CACHE_TTL_SECONDS")
+
+    # --- Embedding Cache Settings ---
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_max_items: int = Field(default=5000, env="EMBEDDING_CACHE_MAX_ITEMS")
+    embedding_cache_ttl_seconds: int = Field(default=604800, env="EMBEDDING_CACHE_TTL_SECONDS")
+
+    # --- Embedding Batching Settings ---
+    embedding_batching_enabled: bool = Field(default=True, env="EMBEDDING_BATCHING_ENABLED")
+    embedding_batch_max_size: int = Field(default=96, env="EMBEDDING_BATCH_MAX_SIZE")
+    embedding_batch_max_wait_ms: int = Field(default=10, env="EMBEDDING_BATCH_MAX_WAIT_MS")
+
+    # --- Scraper Settings ---
+    scrape_max_concurrency: int = Field(default=8, env="SCRAPE_MAX_CONCURRENCY")
+    scrape_per_host_concurrency: int = Field(default=2, env="SCRAPE_PER_HOST_CONCURRENCY")
+    scrape_deadline_seconds: float = Field(default=8.0, env="SCRAPE_DEADLINE_SECONDS")
+    html_extractor: str = Field(default="lxml", env="HTML_EXTRACTOR")  # lxml | bs4
+
+    # --- Page Cache Settings ---
+    page_cache_enabled: bool = Field(default=True, env="PAGE_CACHE_ENABLED")
+    page_cache_ttl_seconds: int = Field(default=900, env="PAGE_CACHE_TTL_SECONDS")
+    page_cache_max_age_seconds: int = Field(default=86400, env="PAGE_CACHE_MAX_AGE_SECONDS")
+
+    # --- CPU Offload Settings ---
+    cpu_executor: str = Field(default="thread", env="CPU_EXECUTOR")  # thread | process
+    cpu_thread_pool_workers: int = Field(default=4, env="CPU_THREAD_POOL_WORKERS")
+    cpu_process_pool_workers: int = Field(default=2, env="CPU_PROCESS_POOL_WORKERS")
+
+    # --- Outbound HTTP Settings ---
+    http_max_connections: int = Field(default=100, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(default=20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry: float = Field(default=30.0, env="HTTP_KEEPALIVE_EXPIRY")
+    http_connect_timeout: float = Field(default=5.0, env="HTTP_CONNECT_TIMEOUT")
+    http_read_timeout: float = Field(default=10.0, env="HTTP_READ_TIMEOUT")
+    http_pool_timeout: float = Field(default=5.0, env="HTTP_POOL_TIMEOUT")
+    http_enable_http2: bool = Field(default=False, env="HTTP_ENABLE_HTTP2")
+
+    # --- LLM Call Cache Settings ---
+    llm_cache_enabled: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    llm_cache_ttl_seconds: int = Field(default=86400, env="LLM_CACHE_TTL_SECONDS")
+    llm_cache_max_items: int = Field(default=2000, env="LLM_CACHE_MAX_ITEMS")
+
+    # --- Single-Flight Settings ---
+    singleflight_enabled: bool = Field(default=True, env="SINGLEFLIGHT_ENABLED")
+    singleflight_lock_ttl_seconds: int = Field(default=60, env="SINGLEFLIGHT_LOCK_TTL_SECONDS")
+    singleflight_wait_seconds: float = Field(default=30.0, env="SINGLEFLIGHT_WAIT_SECONDS")
+    singleflight_poll_interval_ms: int = Field(default=100, env="SINGLEFLIGHT_POLL_INTERVAL_MS")
+
+    # --- Startup Settings ---
+    fast_startup: bool = Field(default=False, env="FAST_STARTUP")
+    startup_warmup_enabled: bool = Field(default=False, env="STARTUP_WARMUP_ENABLED")
 
     # --- Other Optional Settings ---
     use_function_calling: bool = Field(default=True, env="USE_FUNCTION_CALLING")
     use_semantic_cache: bool = Field(default=False, env="USE_SEMANTIC_CACHE")
 
+    # --- Semantic Cache Settings ---
+    semantic_cache_threshold: float = Field(default=0.92, env="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_ttl_seconds: int = Field(default=3600, env="SEMANTIC_CACHE_TTL_SECONDS")
+    semantic_cache_max_entries: int = Field(default=5000, env="SEMANTIC_CACHE_MAX_ENTRIES")
+    semantic_cache_channel: str = Field(default="askgenie:semantic-cache", env="SEMANTIC_CACHE_CHANNEL")
+
 
     def load_model_configs(self) -> None:
         """Load appropriate model names based on selected providers."""
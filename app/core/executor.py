@@ -0,0 +1,105 @@
+# app/core/executor.py
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+from app.core.config import settings
+from app.core.logger import logger
+
+THREAD = "thread"
+PROCESS = "process"
+
+_pools: Dict[str, Executor] = {}
+
+
+class PoolStats:
+    """
+    Queue-wait counters for one pool: time between submitting a job and a worker picking it up.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.jobs = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.jobs += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "avg_wait_ms": round(self.total_wait / self.jobs * 1000, 3) if self.jobs else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+_stats: Dict[str, PoolStats] = {THREAD: PoolStats(THREAD), PROCESS: PoolStats(PROCESS)}
+
+
+def _timed_call(func: Callable, submitted_at: float, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    # Runs inside the worker. Wall clock is used because the worker may be another process.
+    started_at = time.time()
+    return started_at - submitted_at, func(*args, **kwargs)
+
+
+def _get_pool(kind: str) -> Executor:
+    pool = _pools.get(kind)
+    if pool is None:
+        if kind == PROCESS:
+            pool = ProcessPoolExecutor(max_workers=settings.cpu_process_pool_workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=settings.cpu_thread_pool_workers, thread_name_prefix="cpu-worker")
+        _pools[kind] = pool
+        logger.info(f"[Executor] Started {kind} pool.")
+    return pool
+
+
+async def _run(kind: str, func: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    wait, result = await loop.run_in_executor(_get_pool(kind), _timed_call, func, time.time(), args, kwargs)
+    _stats[kind].record(wait)
+    if wait > 0.1:
+        logger.warning(f"[Executor] {getattr(func, '__name__', func)} waited {wait * 1000:.0f} ms in the {kind} pool queue.")
+    return result
+
+
+async def run_in_thread(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run `func` on the thread pool. Use for work on objects that cannot be pickled,
+    or native code that releases the GIL (e.g. large NumPy operations).
+    """
+    return await _run(THREAD, func, *args, **kwargs)
+
+
+async def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a CPU-heavy `func` on the pool selected by settings.cpu_executor.
+    With the process pool, `func` and its arguments must be picklable (module-level functions).
+    """
+    kind = PROCESS if settings.cpu_executor.lower() == PROCESS else THREAD
+    return await _run(kind, func, *args, **kwargs)
+
+
+def executor_stats_snapshot() -> Dict[str, dict]:
+    """Queue-wait statistics per pool."""
+    return {kind: stats.snapshot() for kind, stats in _stats.items()}
+
+
+def startup() -> None:
+    """Create the configured pools up front. Called from the FastAPI lifespan hook."""
+    _get_pool(THREAD)
+    if settings.cpu_executor.lower() == PROCESS:
+        _get_pool(PROCESS)
+
+
+def shutdown() -> None:
+    """Stop all pools, dropping queued jobs."""
+    pools = list(_pools.items())
+    _pools.clear()
+    for kind, pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"[Executor] Stopped {kind} pool.")
@@ -0,0 +1,103 @@
+# app/core/http_client.py
+
+import importlib.util
+import time
+from typing import Dict
+import httpx
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import UPSTREAM_IN_FLIGHT, record_upstream
+
+# Upstream classes. Each gets one pooled client so keep-alive connections are reused.
+SERPER = "serper"   # Serper search, shopping and news APIs
+BRAVE = "brave"     # Brave search API
+WEB = "web"         # Arbitrary pages fetched by the scraper
+
+UPSTREAMS = (SERPER, BRAVE, WEB)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Pooled transport that records the latency and status class of every request
+    under its upstream name.
+    """
+
+    def __init__(self, name: str, transport: httpx.AsyncBaseTransport):
+        self.name = name
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        in_flight = UPSTREAM_IN_FLIGHT.labels(self.name)
+        in_flight.inc()
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            outcome = f"{response.status_code // 100}xx"
+            return response
+        finally:
+            record_upstream(self.name, outcome, time.perf_counter() - start)
+            in_flight.dec()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    """
+    Build a pooled client for one upstream class using the configured limits and timeouts.
+    """
+    http2 = settings.http_enable_http2
+    if http2 and not _http2_available():
+        logger.warning("[HTTP] HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1.")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.http_connect_timeout,
+        read=settings.http_read_timeout,
+        write=settings.http_read_timeout,
+        pool=settings.http_pool_timeout,
+    )
+    logger.info(f"[HTTP] Creating pooled client '{name}' (http2: {http2}, max connections: {limits.max_connections}).")
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    return httpx.AsyncClient(transport=_InstrumentedTransport(name, transport), timeout=timeout)
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for an upstream class.
+    Clients are normally created by `startup()`; one is created on demand if used outside the app lifespan.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = _build_client(name)
+    return client
+
+
+async def startup() -> None:
+    """Create the shared clients. Called from the FastAPI lifespan hook."""
+    for name in UPSTREAMS:
+        get_client(name)
+
+
+async def shutdown() -> None:
+    """Close all shared clients and their pooled connections."""
+    clients = list(_clients.items())
+    _clients.clear()
+    for name, client in clients:
+        try:
+            await client.aclose()
+            logger.info(f"[HTTP] Closed pooled client '{name}'.")
+        except Exception as e:
+            logger.error(f"[HTTP] Error closing client '{name}': {e}")
@@ -0,0 +1,163 @@
+# app/core/metrics.py
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from app.core.tracing import current_trace
+
+# Stages of one answer. They nest (e.g. "tools" inside "answer_llm", "extract" inside
+# "scrape"), so per-stage sums are not meant to add up to the request time.
+STAGES = (
+    "request", "rephrase", "search", "scrape", "extract", "chunk", "embed",
+    "retrieve", "answer_llm", "tools", "followups",
+)
+
+# Sub-10 ms cache and CPU steps up to multi-second LLM calls.
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "askgenie_stage_duration_seconds",
+    "Time spent in each stage of answering a request.",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+STAGE_IN_FLIGHT = Gauge(
+    "askgenie_stage_in_flight",
+    "Stage executions currently running.",
+    ["stage"],
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "askgenie_cache_requests_total",
+    "Cache lookups by cache and result (hit / miss).",
+    ["cache", "result"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "askgenie_upstream_requests_total",
+    "Calls to external services by upstream and outcome (HTTP status class or error).",
+    ["upstream", "outcome"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "askgenie_upstream_duration_seconds",
+    "Latency of calls to external services.",
+    ["upstream"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "askgenie_upstream_in_flight",
+    "Calls to external services currently waiting on a response.",
+    ["upstream"],
+    multiprocess_mode="livesum",
+)
+SEARCH_ROUTE_DECISIONS = Counter(
+    "askgenie_search_route_decisions_total",
+    "Search provider calls started by the router, by provider and reason (primary / hedge / failover).",
+    ["provider", "reason"],
+)
+SEARCH_ROUTE_OUTCOMES = Counter(
+    "askgenie_search_route_outcomes_total",
+    "Routed search calls by provider and outcome (ok / empty / error / abandoned).",
+    ["provider", "outcome"],
+)
+SEARCH_ROUTE_SECONDS = Histogram(
+    "askgenie_search_route_duration_seconds",
+    "Latency of routed search calls as the router sees it, including calls abandoned for a faster provider.",
+    ["provider"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# Redis round trips sit well under the stage buckets; resolve them down to 0.25 ms.
+_REDIS_BUCKETS = (0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+REDIS_POOL_WAIT_SECONDS = Histogram(
+    "askgenie_redis_pool_wait_seconds",
+    "Time spent waiting for a Redis connection from the pool (including connecting).",
+    ["pool"],
+    buckets=_REDIS_BUCKETS,
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "askgenie_redis_command_duration_seconds",
+    "Time a Redis command or pipeline holds its connection, i.e. the round trip.",
+    ["pool"],
+    buckets=_REDIS_BUCKETS,
+)
+REDIS_CONNECTIONS_IN_USE = Gauge(
+    "askgenie_redis_connections_in_use",
+    "Redis connections currently checked out of the pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a block as `stage` and count it as in flight while it runs.
+    The span is also added to the current request's trace, if there is one.
+    """
+    in_flight = STAGE_IN_FLIGHT.labels(stage)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        STAGE_SECONDS.labels(stage).observe(end - start)
+        in_flight.dec()
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span(stage, start, end)
+
+
+@contextmanager
+def track_upstream(upstream: str):
+    """
+    Time one call to an external service. The outcome is "ok", or "error" if the block
+    raises; HTTP callers that know the status use record_upstream() instead.
+    """
+    in_flight = UPSTREAM_IN_FLIGHT.labels(upstream)
+    in_flight.inc()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        record_upstream(upstream, outcome, time.perf_counter() - start)
+        in_flight.dec()
+
+
+def record_upstream(upstream: str, outcome: str, seconds: float) -> None:
+    UPSTREAM_REQUESTS.labels(upstream, outcome).inc()
+    UPSTREAM_SECONDS.labels(upstream).observe(seconds)
+
+
+def record_search_route(provider: str, reason: str) -> None:
+    SEARCH_ROUTE_DECISIONS.labels(provider, reason).inc()
+
+
+def record_search_outcome(provider: str, outcome: str, seconds: float) -> None:
+    SEARCH_ROUTE_OUTCOMES.labels(provider, outcome).inc()
+    SEARCH_ROUTE_SECONDS.labels(provider).observe(seconds)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+    trace = current_trace()
+    if trace is not None:
+        trace.add_cache(cache, hit)
+
+
+def render() -> Tuple[bytes, str]:
+    """
+    Current metrics in the Prometheus text format. Under several worker processes, set
+    PROMETHEUS_MULTIPROC_DIR so every worker's samples are aggregated.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
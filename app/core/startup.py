@@ -0,0 +1,54 @@
+# app/core/startup.py
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+from app.core.logger import logger
+
+
+class StartupReport:
+    """
+    Wall-clock time of each startup phase in this worker: module imports and service init
+    during the lifespan, plus provider imports that were deferred to first use.
+    """
+
+    def __init__(self):
+        self.phases: List[dict] = []
+        self.ready_seconds: float = 0.0
+        self._nested: List[float] = []
+
+    def record(self, phase: str, kind: str, seconds: float) -> None:
+        self.phases.append({"phase": phase, "kind": kind, "ms": round(seconds * 1000, 2)})
+
+    @contextmanager
+    def phase(self, phase: str, kind: str = "init"):
+        """
+        Time a block. Phases may nest (a provider import inside the service init that
+        triggers it); each records its own time only, so kinds can be totalled.
+        """
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            self.record(phase, kind, elapsed - inner)
+
+    def ready(self, seconds: float) -> None:
+        """Mark the worker ready to serve, `seconds` after its first import, and log the breakdown."""
+        self.ready_seconds = seconds
+        breakdown = ", ".join(f"{p['phase']} {p['ms']:.0f}ms" for p in self.phases)
+        logger.info(f"[Startup] Ready in {seconds * 1000:.0f}ms ({breakdown}).")
+
+    def snapshot(self) -> dict:
+        totals: Dict[str, float] = {}
+        for p in self.phases:
+            totals[p["kind"]] = round(totals.get(p["kind"], 0.0) + p["ms"], 2)
+        return {"ready_ms": round(self.ready_seconds * 1000, 2), "totals_ms": totals, "phases": self.phases}
+
+
+# ✅ Instantiate once
+startup_report = StartupReport()
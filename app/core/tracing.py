@@ -0,0 +1,97 @@
+# app/core/tracing.py
+
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("askgenie_trace", default=None)
+
+
+class RequestTrace:
+    """
+    What happened while answering one request: stage spans, cache lookups, pages scraped,
+    and chunk / token counts.
+
+    The trace lives in a context variable, so tasks spawned while handling the request
+    (follow-ups, per-page scraping) record into the same object.
+    """
+
+    def __init__(self, detailed: bool = False):
+        # Detailed traces also ask providers for usage data, which some calls only return on request.
+        self.detailed = detailed
+        self.start = time.perf_counter()
+        self.spans: List[dict] = []
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.pages: List[dict] = []
+        self.counts: Dict[str, int] = {}
+        self.tokens: Dict[str, Dict[str, int]] = {}
+
+    def _ms(self, at: float) -> float:
+        return round((at - self.start) * 1000, 2)
+
+    def add_span(self, stage: str, start: float, end: float) -> None:
+        self.spans.append({"stage": stage, "start_ms": self._ms(start), "duration_ms": round((end - start) * 1000, 2)})
+
+    def add_cache(self, cache: str, hit: bool) -> None:
+        entry = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+        entry["hits" if hit else "misses"] += 1
+
+    def add_page(self, url: str, seconds: float, error: Optional[str] = None) -> None:
+        self.pages.append({"url": url, "ok": error is None, "latency_ms": round(seconds * 1000, 2), "error": error})
+
+    def add_count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def add_tokens(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        entry = self.tokens.setdefault(model, {"prompt_tokens": 0, "completion_tokens": 0})
+        entry["prompt_tokens"] += prompt_tokens or 0
+        entry["completion_tokens"] += completion_tokens or 0
+
+    def stage_windows(self) -> Dict[str, dict]:
+        """
+        Per stage: wall-clock window from its first start to its last end, and span count.
+        A window, not a sum, so concurrent spans (one scrape per URL) are not double counted.
+        """
+        windows: Dict[str, dict] = {}
+        for span in self.spans:
+            end = span["start_ms"] + span["duration_ms"]
+            window = windows.get(span["stage"])
+            if window is None:
+                windows[span["stage"]] = {"start_ms": span["start_ms"], "end_ms": end, "spans": 1}
+            else:
+                window["start_ms"] = min(window["start_ms"], span["start_ms"])
+                window["end_ms"] = max(window["end_ms"], end)
+                window["spans"] += 1
+        return windows
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header."""
+        parts = []
+        for stage, window in self.stage_windows().items():
+            part = f"{stage};dur={window['end_ms'] - window['start_ms']:.1f}"
+            if window["spans"] > 1:
+                part += f';desc="{window["spans"]} spans"'
+            parts.append(part)
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "total_ms": self._ms(time.perf_counter()),
+            "spans": self.spans,
+            "caches": self.caches,
+            "pages": self.pages,
+            "counts": self.counts,
+            "tokens": self.tokens,
+        }
+
+
+def start_trace(detailed: bool = False) -> RequestTrace:
+    """Begin a trace for the request handled in the current context."""
+    trace = RequestTrace(detailed=detailed)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
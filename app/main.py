@@ -1,12 +1,90 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.api.answer import router as answer_router
+from app.cache import cache_stats_snapshot, listen_for_invalidations, redis
+from app.core import executor, http_client, metrics
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.startup import startup_report
+from app.semantic_cache import semantic_cache
+from app.services.llm import llm_service
+from app.services.rag import embedding_service
+from app.services.search_router import search_router
+
+startup_report.record("import app", "import", time.perf_counter() - _IMPORT_START)
+
+
+async def _warm_up() -> None:
+    """
+    Optional one-off work so the first request does not pay for connection setup and lazy loads.
+    """
+    with startup_report.phase("warmup_redis"):
+        try:
+            await redis.ping()
+        except Exception as e:
+            logger.error(f"[Startup] Redis warm-up ping failed: {e}")
+    await embedding_service.warm_up()
+
+
+async def _background_startup() -> None:
+    # FAST_STARTUP: the worker is already serving; finish the optional work behind it.
+    if settings.use_semantic_cache:
+        with startup_report.phase("semantic_cache"):
+            await semantic_cache.warm()
+    if settings.startup_warmup_enabled:
+        await _warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared outbound HTTP clients live for the whole app so connections stay warm.
+    with startup_report.phase("http_clients"):
+        await http_client.startup()
+    with startup_report.phase("executor"):
+        executor.startup()
+
+    tasks = []
+    if settings.answer_cache_local_enabled:
+        # Keeps this worker's in-process answers in step with other workers' writes.
+        tasks.append(asyncio.create_task(listen_for_invalidations()))
+    if settings.use_semantic_cache:
+        # Indexes answers other workers store after this one has warmed.
+        tasks.append(asyncio.create_task(semantic_cache.listen()))
+
+    if settings.fast_startup:
+        # Provider clients are built on first use instead.
+        tasks.append(asyncio.create_task(_background_startup()))
+    else:
+        llm_service.ensure_client()
+        embedding_service.ensure_embedder()
+        if settings.use_semantic_cache:
+            with startup_report.phase("semantic_cache"):
+                await semantic_cache.warm()
+        if settings.startup_warmup_enabled:
+            await _warm_up()
+    startup_report.ready(time.perf_counter() - _IMPORT_START)
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await http_client.shutdown()
+        executor.shutdown()
+
 
-app = FastAPI(title="LLM Answer Engine API")
+app = FastAPI(title="LLM Answer Engine API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,3 +112,40 @@ async def index(request: Request):
 @app.get("/health", response_model=None)
 async def health_check():
     return JSONResponse(content={"status": "ok"}, status_code=200)
+
+
+@app.get("/metrics", response_model=None, include_in_schema=False)
+async def prometheus_metrics():
+    """Stage latencies, cache hit/miss, upstream calls and in-flight gauges in Prometheus text format."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/stats/cache", response_model=None)
+async def cache_stats():
+    """Hit/miss counters of the caches in this worker."""
+    return JSONResponse(content=cache_stats_snapshot(), status_code=200)
+
+
+@app.get("/stats/executor", response_model=None)
+async def executor_stats():
+    """Queue-wait statistics of the CPU offload pools in this worker."""
+    return JSONResponse(content=executor.executor_stats_snapshot(), status_code=200)
+
+
+@app.get("/stats/startup", response_model=None)
+async def startup_stats():
+    """Time this worker spent importing modules and initializing services before it was ready."""
+    return JSONResponse(content=startup_report.snapshot(), status_code=200)
+
+
+@app.get("/stats/embeddings", response_model=None)
+async def embedding_stats():
+    """Batch fill ratio and queue wait of the embedding micro-batchers in this worker."""
+    return JSONResponse(content=embedding_service.batcher_stats_snapshot(), status_code=200)
+
+
+@app.get("/stats/search", response_model=None)
+async def search_stats():
+    """Routing decisions and EWMA latency / error rate per search provider in this worker."""
+    return JSONResponse(content=search_router.snapshot(), status_code=200)
@@ -8,12 +8,14 @@ class AnswerRequest(BaseModel):
     return_follow_up_questions: bool = True
     embed_sources_in_llm_response: bool = False
 
-    text_chunk_size: int = Field(default=1000, ge=100)
-    text_chunk_overlap: int = Field(default=200, ge=0)
+    # Measured in CHUNK_UNIT (characters or tokens); unset means CHUNK_SIZE / CHUNK_OVERLAP.
+    text_chunk_size: Optional[int] = Field(default=None, ge=100)
+    text_chunk_overlap: Optional[int] = Field(default=None, ge=0)
     number_of_similarity_results: int = Field(default=2, ge=1)
     number_of_pages_to_scan: int = Field(default=4, ge=1)
 
     stream: bool = False  # ✅ Add this line
+    include_trace: bool = False  # Add stage timings, cache hits, pages and token counts to the response
 
 class Source(BaseModel):
     title: str
@@ -29,3 +31,4 @@ class AnswerResponse(BaseModel):
     sources: Optional[List[Source]] = None
     follow_up_questions: Optional[List[str]] = None
     tool_outputs: Optional[List[Dict[str, Any]]] = None   # 🎯 Fix here
+    trace: Optional[Dict[str, Any]] = None  # Only when the request set include_trace
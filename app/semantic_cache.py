@@ -0,0 +1,248 @@
+# app/semantic_cache.py
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import numpy as np
+from app.cache import redis, redis_client, get_cache_stats
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.schemas import AnswerRequest, AnswerResponse
+from app.services.rag import embedding_service
+
+KEY_PREFIX = "semcache:"
+# How many recently embedded messages to remember so a miss followed by a store embeds once.
+_RECENT_VECTORS = 256
+# Keys fetched per pipeline while warming the index.
+_WARM_BATCH = 500
+# Identifies this worker's own store announcements so it does not re-read what it just indexed.
+_WORKER_ID = uuid.uuid4().hex
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour answer cache for paraphrased questions.
+
+    Query embeddings are indexed in-process as unit vectors; the answers themselves live in
+    Redis under the same TTL. An index entry whose Redis payload has gone is treated as a miss
+    and dropped, so Redis eviction and the local index never disagree for long. Entries only
+    match requests with the same options (sources, follow-ups, chunking, ...), and each store
+    is announced on `channel` so other workers index it too.
+    """
+
+    def __init__(self, threshold: float, ttl: int, max_entries: int, channel: str):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.channel = channel
+        self.stats = get_cache_stats("semantic")
+        # key -> (unit vector, expires_at, options variant). Kept in expiry order, oldest first.
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float, str]]" = OrderedDict()
+        self._keys: List[str] = []
+        self._variants: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._dirty = False
+        self._recent_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def _variant(endpoint_request: AnswerRequest) -> str:
+        """The request options that change the answer; only entries with the same variant match."""
+        options = endpoint_request.model_dump(exclude={"message", "stream", "include_trace"})
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _key(message: str, variant: str) -> str:
+        return KEY_PREFIX + hashlib.sha256(f"{variant}:{message}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def _embed(self, message: str) -> np.ndarray:
+        vector = self._recent_vectors.pop(message, None)
+        if vector is None:
+            vector = self._normalize(await embedding_service.embed_query(message))
+        self._recent_vectors[message] = vector
+        while len(self._recent_vectors) > _RECENT_VECTORS:
+            self._recent_vectors.popitem(last=False)
+        return vector
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and, if still over capacity, the ones closest to expiry."""
+        while self._entries:
+            _, expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    def _drop(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def _add(self, key: str, vector: np.ndarray, expires_at: float, variant: str) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (vector, expires_at, variant)
+        self._dirty = True
+
+    def _index(self) -> Tuple[List[str], Optional[np.ndarray], Optional[np.ndarray]]:
+        if self._dirty or (self._matrix is None and self._entries):
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[k][0] for k in self._keys]) if self._keys else None
+            self._variants = np.array([self._entries[k][2] for k in self._keys]) if self._keys else None
+            self._dirty = False
+        return self._keys, self._matrix, self._variants
+
+    async def lookup(self, endpoint_request: AnswerRequest) -> Optional[dict]:
+        """
+        Return the cached response of the most similar previous question asked with the
+        same options, or None if nothing scores above the threshold.
+        """
+        message = endpoint_request.message
+        try:
+            self._evict(time.time())
+            keys, matrix, variants = self._index()
+            if matrix is None:
+                # Nothing to compare against, so do not pay for the embedding.
+                self.stats.miss()
+                return None
+
+            vector = await self._embed(message)
+            scores = np.where(variants == self._variant(endpoint_request), matrix @ vector, -np.inf)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold:
+                self.stats.miss()
+                return None
+
+            value = await redis.get(keys[best])
+            if not value:
+                self._drop(keys[best])
+                self.stats.miss()
+                return None
+
+            payload = json.loads(value)
+            self.stats.hit()
+            logger.info(f"[Semantic Cache] Hit for '{message}' (matched '{payload.get('message')}', score {score:.3f})")
+            return payload["response"]
+        except Exception as e:
+            logger.error(f"[Semantic Cache] Error during lookup: {e}")
+            return None
+
+    async def store(self, endpoint_request: AnswerRequest, response: AnswerResponse) -> None:
+        """
+        Cache `response` under the embedding of the request's message and its options.
+        """
+        message = endpoint_request.message
+        try:
+            vector = await self._embed(message)
+            variant = self._variant(endpoint_request)
+            key = self._key(message, variant)
+            payload = {
+                "message": message,
+                "variant": variant,
+                "vector": vector.tolist(),
+                "response": response.model_dump(mode="json"),
+            }
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.setex(key, self.ttl, json.dumps(payload))
+                pipe.publish(self.channel, json.dumps({"origin": _WORKER_ID, "key": key}))
+                await pipe.execute()
+
+            self._add(key, vector, time.time() + self.ttl, variant)
+            self._evict(time.time())
+            self._recent_vectors.pop(message, None)
+            logger.info(f"[Semantic Cache] Stored answer for '{message}'")
+        except Exception as e:
+            logger.error(f"[Semantic Cache] Error storing answer: {e}")
+
+    async def _load(self, keys: List[str], now: float) -> List[Tuple[float, str, np.ndarray, str]]:
+        """Fetch payloads and remaining TTLs for `keys` in one round trip."""
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.pttl(key)
+            results = await pipe.execute()
+
+        loaded = []
+        for key, value, pttl in zip(keys, results[::2], results[1::2]):
+            if not value or pttl is None or pttl <= 0:
+                continue
+            payload = json.loads(value)
+            vector = np.asarray(payload["vector"], dtype=np.float32)
+            loaded.append((now + pttl / 1000, key, vector, payload.get("variant", "")))
+        return loaded
+
+    async def warm(self) -> None:
+        """
+        Rebuild the in-process index from entries other workers already wrote to Redis.
+        """
+        try:
+            now = time.time()
+            loaded, batch = [], []
+            async for key in redis.scan_iter(match=f"{KEY_PREFIX}*", count=_WARM_BATCH):
+                batch.append(key)
+                if len(batch) >= _WARM_BATCH:
+                    loaded.extend(await self._load(batch, now))
+                    batch = []
+            if batch:
+                loaded.extend(await self._load(batch, now))
+
+            for expires_at, key, vector, variant in sorted(loaded, key=lambda item: item[0]):
+                self._add(key, vector, expires_at, variant)
+            self._evict(now)
+            logger.info(f"[Semantic Cache] Loaded {len(self._entries)} cached question(s) from Redis.")
+        except Exception as e:
+            logger.error(f"[Semantic Cache] Error warming index: {e}")
+
+    async def listen(self) -> None:
+        """
+        Index answers other workers store, as announced on the channel. Runs for the app's
+        lifetime on its own connection. After a disconnect the index is re-warmed from Redis,
+        since announcements may have been missed.
+        """
+        # One long-lived connection that idles between messages, so no read timeout.
+        client = redis_client("semantic_pubsub", decode_responses=True, max_connections=1, socket_timeout=None)
+        rewarm = False
+        while True:
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    logger.info(f"[Semantic Cache] Listening for stored answers on {self.channel}.")
+                    if rewarm:
+                        await self.warm()
+                        rewarm = False
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        event = json.loads(message["data"])
+                        if event.get("origin") == _WORKER_ID:
+                            continue
+                        for expires_at, key, vector, variant in await self._load([event["key"]], time.time()):
+                            self._add(key, vector, expires_at, variant)
+                        self._evict(time.time())
+            except asyncio.CancelledError:
+                await client.aclose()
+                raise
+            except Exception as e:
+                logger.error(f"[Semantic Cache] Store listener failed, retrying: {e}")
+                rewarm = True
+                await asyncio.sleep(5)
+
+    def snapshot(self) -> dict:
+        return {"entries": len(self._entries), **self.stats.snapshot()}
+
+
+# ✅ Instantiate once
+semantic_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    ttl=settings.semantic_cache_ttl_seconds,
+    max_entries=settings.semantic_cache_max_entries,
+    channel=settings.semantic_cache_channel,
+)
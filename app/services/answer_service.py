@@ -6,7 +6,7 @@ from app.services.scraper import scrape_documents
 from app.services.rag import embedding_service
 from app.services.llm import llm_service
 from app.cache import get_cached_answer, set_cached_answer
-from app.services.utils import rate_limit_check
+from app.services.utils import rate_limit_and_get_cached
 from app.core.logger import logger
 import traceback
 from app.models.schemas import AnswerRequest, Source
@@ -15,126 +15,221 @@ from app.services.scraper import scrape_documents
 from app.services.rag import embedding_service
 from app.services.llm import llm_service
 from app.cache import get_cached_answer, set_cached_answer
-from app.services.utils import rate_limit_check
+from app.services.utils import rate_limit_and_get_cached
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.metrics import track_stage
+from app.core.tracing import start_trace
+from app.semantic_cache import semantic_cache
+from app.services.pipeline import retrieve_incrementally
+from app.services.singleflight import answer_flight, flight_key, flight_lock, stream_flight, wait_for_flight
+import asyncio
 import traceback
 import json
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional, Tuple
 
 
 
-async def generate_answer(endpoint_request: AnswerRequest, request: Request) -> AnswerResponse:
+async def _discard(task: Optional[asyncio.Task]) -> None:
     """
-    Orchestrator function to handle the complete answer generation pipeline.
+    Cancel `task` if it is still running and wait for it to finish, so its cancellation
+    or error is retrieved instead of logged when the task is garbage-collected.
     """
-    client_ip = request.client.host
-
-    logger.info(f"[Answer Service] Received request from {client_ip}")
-    logger.debug(f"Request payload: {endpoint_request.model_dump()}")
-
-    try:
-        logger.debug(f"Type of number_of_pages_to_scan: {type(endpoint_request.number_of_pages_to_scan)}")
-        logger.debug(f"Type of number_of_similarity_results: {type(endpoint_request.number_of_similarity_results)}")
-
-        if not await rate_limit_check(client_ip):
-            logger.warning(f"[Answer Service] Rate limit exceeded for IP: {client_ip}")
-            return AnswerResponse(answer="Rate limit exceeded. Please try again later.")
-
-        # Cache check
-        cached = await get_cached_answer(endpoint_request.message)
-        if cached:
-            logger.info(f"[Answer Service] Found cached answer for query: {endpoint_request.message}")
-            return AnswerResponse(**cached)
-
-        # Rephrase
-        logger.debug("[Answer Service] Rephrasing query...")
-        rephrased = await llm_service.rephrase_input(endpoint_request.message)
-        logger.debug(f"[Answer Service] Rephrased query: {rephrased}")
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
 
-        # Search and scrape
-        logger.debug("[Answer Service] Searching documents...")
-        docs = await search_selector(rephrased, count=endpoint_request.number_of_pages_to_scan)
-        logger.debug(f"[Answer Service] Search returned {len(docs)} documents.")
 
+async def _retrieve_and_answer(
+    endpoint_request: AnswerRequest, rephrased: str
+) -> Optional[Tuple[str, Optional[List[dict]], List[Source]]]:
+    """
+    Main path of the pipeline: search, scrape, embed, retrieve and answer.
+    Returns (answer, tool_outputs, sources), or None when nothing could be scraped.
+    """
+    # Search and scrape
+    logger.debug("[Answer Service] Searching documents...")
+    docs = await search_selector(rephrased, count=endpoint_request.number_of_pages_to_scan)
+    logger.debug(f"[Answer Service] Search returned {len(docs)} documents.")
+
+    if settings.pipeline_incremental_enabled:
+        # Each page is chunked, embedded and scored as soon as it is scraped.
+        logger.debug("[Answer Service] Scraping, chunking and embedding pages as they arrive...")
+        related_docs = await retrieve_incrementally(
+            docs,
+            rephrased,
+            k=endpoint_request.number_of_similarity_results,
+            chunk_size=endpoint_request.text_chunk_size,
+            chunk_overlap=endpoint_request.text_chunk_overlap,
+        )
+        if not related_docs:
+            logger.error(f"[Answer Service] No documents scraped for query: {rephrased}")
+            return None
+    else:
         scraped_texts, metadatas = await scrape_documents(docs)
         logger.debug(f"[Answer Service] Scraped {len(scraped_texts)} documents.")
 
         if not scraped_texts:
             logger.error(f"[Answer Service] No documents scraped for query: {rephrased}")
-            return AnswerResponse(answer="No relevant sources found.")
+            return None
 
         # Embed
         logger.debug("[Answer Service] Chunking and embedding scraped content...")
-        store = embedding_service.chunk_and_embed(scraped_texts, metadatas)
-        related_docs = embedding_service.similarity_search(
+        store = await embedding_service.chunk_and_embed(
+            scraped_texts,
+            metadatas,
+            chunk_size=endpoint_request.text_chunk_size,
+            chunk_overlap=endpoint_request.text_chunk_overlap,
+        )
+        related_docs = await embedding_service.similarity_search(
             store, rephrased, k=endpoint_request.number_of_similarity_results
         )
 
-        context = "\n\n".join([doc["text"] for doc in related_docs])
-        sources = [
-            Source(title=doc.get("title", ""), link=doc.get("link", ""))
-            for doc in related_docs if "link" in doc
-        ]
+    context = "\n\n".join([doc["text"] for doc in related_docs])
+    sources = [
+        Source(title=doc.get("title", ""), link=doc.get("link", ""))
+        for doc in related_docs if "link" in doc
+    ]
 
-        # Generate answer
-        logger.debug("[Answer Service] Generating final answer using LLM...")
-        answer_content, tool_outputs = await llm_service.generate_answer_text(context, rephrased)
-
-        # Follow-ups
-        followups = []
-        if endpoint_request.return_follow_up_questions:
-            logger.debug("[Answer Service] Generating follow-up questions...")
-            followups = await llm_service.generate_followup_questions(rephrased)
-
-        # Final response
-        response = AnswerResponse(
-            answer=answer_content,
-            sources=sources if endpoint_request.return_sources else None,
-            follow_up_questions=followups if endpoint_request.return_follow_up_questions else None,
-            tool_outputs=tool_outputs or [],
-        )
+    # Generate answer
+    logger.debug("[Answer Service] Generating final answer using LLM...")
+    answer_content, tool_outputs = await llm_service.generate_answer_text(context, rephrased)
+    return answer_content, tool_outputs, sources
 
-        # Cache response
-        await set_cached_answer(endpoint_request.message, response.model_dump())
 
-        logger.info(f"[Answer Service] Successfully generated answer for: {endpoint_request.message}")
-        return response
+async def _answer_pipeline(endpoint_request: AnswerRequest) -> AnswerResponse:
+    """
+    Everything after the cache checks: rephrase, retrieve, answer, follow-ups, then cache the result.
+    """
+    # Rephrase
+    logger.debug("[Answer Service] Rephrasing query...")
+    rephrased = await llm_service.rephrase_input(endpoint_request.message)
+    logger.debug(f"[Answer Service] Rephrased query: {rephrased}")
+
+    # Follow-ups only depend on the rephrased query, so they run alongside
+    # search → scrape → embed → answer instead of after it.
+    followups_task = None
+    if endpoint_request.return_follow_up_questions:
+        logger.debug("[Answer Service] Generating follow-up questions in the background...")
+        followups_task = asyncio.create_task(llm_service.generate_followup_questions(rephrased))
 
-    except Exception as e:
-        tb_str = traceback.format_exc()
-        logger.error(f"[Answer Service] ❌ Exception occurred: {e}\nTraceback:\n{tb_str}")
-        return AnswerResponse(answer="An internal error occurred. Please try again later.")
+    try:
+        answer_path = await _retrieve_and_answer(endpoint_request, rephrased)
+        if answer_path is None:
+            return AnswerResponse(answer="No relevant sources found.")
+        answer_content, tool_outputs, sources = answer_path
 
+        followups = await followups_task if followups_task else []
+    finally:
+        # Propagate failure (or an early return) of the answer path to the follow-up call.
+        await _discard(followups_task)
 
+    # Final response
+    response = AnswerResponse(
+        answer=answer_content,
+        sources=sources if endpoint_request.return_sources else None,
+        follow_up_questions=followups if endpoint_request.return_follow_up_questions else None,
+        tool_outputs=tool_outputs or [],
+    )
 
-async def stream_generate_answer(endpoint_request: AnswerRequest, request: Request) -> StreamingResponse:
+    # Cache response
+    await set_cached_answer(endpoint_request.message, response.model_dump(exclude={"trace"}))
+    if settings.use_semantic_cache:
+        await semantic_cache.store(endpoint_request, response)
+
+    logger.info(f"[Answer Service] Successfully generated answer for: {endpoint_request.message}")
+    return response
+
+
+async def _coordinated_answer(endpoint_request: AnswerRequest) -> AnswerResponse:
+    """
+    Run the pipeline unless another worker is already running it for the same request,
+    in which case wait for that worker to cache its answer and reuse it.
+    """
+    key = flight_key(endpoint_request)
+    async with flight_lock(key) as leader:
+        if not leader:
+            logger.info(f"[Answer Service] Another worker is answering {endpoint_request.message!r}; waiting for it.")
+            if await wait_for_flight(key):
+                cached = await get_cached_answer(endpoint_request.message)
+                if cached:
+                    return AnswerResponse(**cached)
+        return await _answer_pipeline(endpoint_request)
+
+
+async def generate_answer(endpoint_request: AnswerRequest, request: Request) -> AnswerResponse:
+    """
+    Orchestrator function to handle the complete answer generation pipeline.
+    """
     client_ip = request.client.host
-    logger.info(f"[Answer Stream] Received request from {client_ip}")
+
+    logger.info(f"[Answer Service] Received request from {client_ip}")
     logger.debug(f"Request payload: {endpoint_request.model_dump()}")
 
-    async def streamer() -> AsyncGenerator[str, None]:
-        try:
-            # Rate limit
-            if not await rate_limit_check(client_ip):
-                yield "Rate limit exceeded. Please try again later."
-                return
+    try:
+        with track_stage("request"):
+            logger.debug(f"Type of number_of_pages_to_scan: {type(endpoint_request.number_of_pages_to_scan)}")
+            logger.debug(f"Type of number_of_similarity_results: {type(endpoint_request.number_of_similarity_results)}")
+
+            # Rate limit and cache check, in one Redis round trip
+            allowed, cached = await rate_limit_and_get_cached(request, endpoint_request.message)
+            if not allowed:
+                logger.warning(f"[Answer Service] Rate limit exceeded for IP: {client_ip}")
+                return AnswerResponse(answer="Rate limit exceeded. Please try again later.")
 
-            # Cache check
-            cached = await get_cached_answer(endpoint_request.message)
             if cached:
-                logger.info("[Answer Stream] Cache hit.")
-                yield cached.get("answer", "")
-                return
+                logger.info(f"[Answer Service] Found cached answer for query: {endpoint_request.message}")
+                return AnswerResponse(**cached)
+
+            if settings.use_semantic_cache:
+                cached = await semantic_cache.lookup(endpoint_request)
+                if cached:
+                    logger.info(f"[Answer Service] Found semantically similar cached answer for: {endpoint_request.message}")
+                    return AnswerResponse(**cached)
+
+            if settings.singleflight_enabled:
+                # Identical requests already in flight share one pipeline run instead of each paying for it.
+                return await answer_flight.do(
+                    flight_key(endpoint_request), lambda: _coordinated_answer(endpoint_request)
+                )
+            return await _answer_pipeline(endpoint_request)
+
+    except Exception as e:
+        tb_str = traceback.format_exc()
+        logger.error(f"[Answer Service] ❌ Exception occurred: {e}\nTraceback:\n{tb_str}")
+        return AnswerResponse(answer="An internal error occurred. Please try again later.")
 
-            # 1️⃣ Rephrase
-            yield "###ACTIVITY### 🔄 Rephrasing query...\n"
-            rephrased = await llm_service.rephrase_input(endpoint_request.message)
 
-            # 2️⃣ Search
-            yield "###ACTIVITY### 🔍 Searching documents...\n"
-            docs = await search_selector(rephrased, count=endpoint_request.number_of_pages_to_scan)
 
+async def _stream_pipeline(endpoint_request: AnswerRequest) -> AsyncGenerator[str, None]:
+    """
+    Everything after the cache checks on the streaming path, as activity frames and answer tokens.
+    """
+    try:
+        # 1️⃣ Rephrase
+        yield "###ACTIVITY### 🔄 Rephrasing query...\n"
+        rephrased = await llm_service.rephrase_input(endpoint_request.message)
+
+        # 2️⃣ Search
+        yield "###ACTIVITY### 🔍 Searching documents...\n"
+        docs = await search_selector(rephrased, count=endpoint_request.number_of_pages_to_scan)
+
+        if settings.pipeline_incremental_enabled:
+            # 3️⃣–5️⃣ Scrape, embed and match each page as it arrives
+            yield "###ACTIVITY### 📄 Scraping & embedding pages as they arrive...\n"
+            related_docs = await retrieve_incrementally(
+                docs,
+                rephrased,
+                k=endpoint_request.number_of_similarity_results,
+                chunk_size=endpoint_request.text_chunk_size,
+                chunk_overlap=endpoint_request.text_chunk_overlap,
+            )
+            if not related_docs:
+                yield "No relevant documents found."
+                return
+        else:
             # 3️⃣ Scrape
             yield "###ACTIVITY### 📄 Scraping content...\n"
             scraped_texts, metadatas = await scrape_documents(docs)
@@ -144,45 +239,152 @@ async def stream_generate_answer(endpoint_request: AnswerRequest, request: Reque
 
             # 4️⃣ Embed
             yield "###ACTIVITY### 📦 Chunking & embedding...\n"
-            store = embedding_service.chunk_and_embed(scraped_texts, metadatas)
+            store = await embedding_service.chunk_and_embed(
+                scraped_texts,
+                metadatas,
+                chunk_size=endpoint_request.text_chunk_size,
+                chunk_overlap=endpoint_request.text_chunk_overlap,
+            )
 
             # 5️⃣ Similarity
             yield "###ACTIVITY### 🤝 Matching relevant info...\n"
-            related_docs = embedding_service.similarity_search(
+            related_docs = await embedding_service.similarity_search(
                 store, rephrased, k=endpoint_request.number_of_similarity_results
             )
 
-            context = "\n\n".join([doc["text"] for doc in related_docs])
-            sources = [
-                Source(title=doc.get("title", ""), link=doc.get("link", ""))
-                for doc in related_docs if "link" in doc
-            ]
-
-            # 6️⃣ Generate Answer
-            yield "###ACTIVITY### 🧠 Generating answer...\n"
-            prompt = [
-                {"role": "system", "content": "You are an intelligent assistant who uses the provided context to answer user questions."},
-                {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {rephrased}"}
-            ]
-
-            async for token in llm_service.stream_chat_completion(messages=prompt, model=settings.answer_model):
-                yield token
-
-            # 7️⃣ Tool Execution
-            yield "\n###ACTIVITY### 🧰 Running tools if needed...\n"
-            _, tool_outputs = await llm_service.chat_completion(
+        context = "\n\n".join([doc["text"] for doc in related_docs])
+        sources = [
+            Source(title=doc.get("title", ""), link=doc.get("link", ""))
+            for doc in related_docs if "link" in doc
+        ]
+
+        # 6️⃣ Generate Answer
+        yield "###ACTIVITY### 🧠 Generating answer...\n"
+        prompt = [
+            {"role": "system", "content": "You are an intelligent assistant who uses the provided context to answer user questions."},
+            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {rephrased}"}
+        ]
+
+        # One streamed completion carries the tools schema; text is forwarded as it
+        # arrives and any tool calls are executed once the stream ends, followed by a
+        # streamed summary of their outputs.
+        answer_parts, tool_outputs = [], []
+        with track_stage("answer_llm"):
+            async for event, value in llm_service.stream_chat_completion_with_tools(
                 messages=prompt,
                 model=settings.answer_model,
-                enable_function_calling=settings.use_function_calling
+                enable_function_calling=settings.use_function_calling,
+            ):
+                if event == "text":
+                    answer_parts.append(value)
+                    yield value
+                elif event == "tool_calls":
+                    # 7️⃣ Tool Execution
+                    yield "\n###ACTIVITY### 🧰 Running tools...\n"
+                elif event == "tool_outputs" and value:
+                    tool_outputs = value
+                    yield "\n###ACTIVITY### 🧾 Tool results ready\n"
+
+        if tool_outputs:
+            # The client reads everything after this marker as JSON, so it goes last
+            # (streamer holds it back until any ###TRACE### frame is out).
+            yield "\n###TOOL_OUTPUT### " + json.dumps(tool_outputs)
+
+        # Cache the streamed answer so repeats, and requests waiting on this one in other
+        # workers, are served without running the pipeline again. Follow-ups are not streamed,
+        # and generating them only for the cache would cost a completion per stream, so the
+        # entry has none.
+        if answer_parts:
+            response = AnswerResponse(
+                answer="".join(answer_parts),
+                sources=sources if endpoint_request.return_sources else None,
+                follow_up_questions=None,
+                tool_outputs=tool_outputs,
             )
+            await set_cached_answer(endpoint_request.message, response.model_dump(exclude={"trace"}))
+            if settings.use_semantic_cache:
+                await semantic_cache.store(endpoint_request, response)
+
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error(f"[Answer Stream] ❌ Error: {e}\n{tb}")
+        yield "\nAn error occurred while generating the answer."
 
-            if tool_outputs:
-                yield "\n###ACTIVITY### 🧾 Tool results ready\n"
-                yield "###TOOL_OUTPUT### " + json.dumps(tool_outputs)
+
+async def _coordinated_stream(endpoint_request: AnswerRequest) -> AsyncGenerator[str, None]:
+    """
+    Streaming counterpart of _coordinated_answer: if another worker is running the same
+    request, wait for its cached answer instead of streaming a second copy.
+    """
+    key = flight_key(endpoint_request)
+    async with flight_lock(key) as leader:
+        if not leader:
+            yield "###ACTIVITY### ⏳ Waiting for an identical request in progress...\n"
+            if await wait_for_flight(key):
+                cached = await get_cached_answer(endpoint_request.message)
+                if cached:
+                    yield cached.get("answer", "")
+                    return
+        async for chunk in _stream_pipeline(endpoint_request):
+            yield chunk
+
+
+async def stream_generate_answer(endpoint_request: AnswerRequest, request: Request) -> StreamingResponse:
+    client_ip = request.client.host
+    logger.info(f"[Answer Stream] Received request from {client_ip}")
+    logger.debug(f"Request payload: {endpoint_request.model_dump()}")
+
+    async def answer_chunks() -> AsyncGenerator[str, None]:
+        try:
+            with track_stage("request"):
+                # Rate limit and cache check, in one Redis round trip
+                allowed, cached = await rate_limit_and_get_cached(request, endpoint_request.message)
+                if not allowed:
+                    yield "Rate limit exceeded. Please try again later."
+                    return
+
+                if cached:
+                    logger.info("[Answer Stream] Cache hit.")
+                    yield cached.get("answer", "")
+                    return
+
+                if settings.use_semantic_cache:
+                    cached = await semantic_cache.lookup(endpoint_request)
+                    if cached:
+                        logger.info("[Answer Stream] Semantic cache hit.")
+                        yield cached.get("answer", "")
+                        return
+
+                if settings.singleflight_enabled:
+                    # Identical streams in flight share one run; joiners replay what was already sent.
+                    chunks = stream_flight.stream(
+                        flight_key(endpoint_request), lambda: _coordinated_stream(endpoint_request)
+                    )
+                else:
+                    chunks = _stream_pipeline(endpoint_request)
+                async for chunk in chunks:
+                    yield chunk
 
         except Exception as e:
             tb = traceback.format_exc()
             logger.error(f"[Answer Stream] ❌ Error: {e}\n{tb}")
             yield "\nAn error occurred while generating the answer."
 
+    async def streamer() -> AsyncGenerator[str, None]:
+        # Headers are already sent by the time stages finish, so the stream carries its
+        # timings in a final ###TRACE### frame instead of a Server-Timing header.
+        # The client reads everything after ###TOOL_OUTPUT### as JSON, so that frame is held
+        # back and sent after the trace.
+        trace = start_trace(detailed=endpoint_request.include_trace)
+        tool_frame = None
+        async for chunk in answer_chunks():
+            if chunk.startswith("\n###TOOL_OUTPUT### "):
+                tool_frame = chunk
+            else:
+                yield chunk
+        if endpoint_request.include_trace:
+            yield "\n###TRACE### " + json.dumps(trace.to_dict())
+        if tool_frame is not None:
+            yield tool_frame
+
     return StreamingResponse(streamer(), media_type="text/plain")
\ No newline at end of file
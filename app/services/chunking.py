@@ -0,0 +1,111 @@
+# app/services/chunking.py
+
+from functools import lru_cache
+from typing import List
+from app.core.logger import logger
+
+CHARS = "chars"
+TOKENS = "tokens"
+
+# Break points tried from the end of a window backwards, best first.
+_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", "; ", ", ", " ")
+
+
+class TextChunker:
+    """
+    Fixed-size chunker with overlap, measuring size in characters or tiktoken tokens.
+
+    Character mode walks the text once and, for each window, looks backwards for the best
+    natural break (paragraph, line, sentence, clause, word) with `str.rfind`, so chunks
+    end on boundaries without the recursive split-and-merge of LangChain's splitter.
+    Token mode encodes the text once and slices fixed token windows.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, unit: str = CHARS, encoding_name: str = "cl100k_base"):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+        if chunk_overlap >= chunk_size:
+            # Keep making progress rather than rejecting the request.
+            logger.warning(f"[Chunker] Overlap {chunk_overlap} >= chunk size {chunk_size}; using {chunk_size // 2}.")
+            chunk_overlap = chunk_size // 2
+        self.chunk_size = chunk_size
+        self.chunk_overlap = max(chunk_overlap, 0)
+        self.unit = unit
+        self._encoding = None
+        if unit == TOKENS:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        elif unit != CHARS:
+            raise ValueError(f"Unsupported chunk unit: {unit}")
+
+    def split_text(self, text: str) -> List[str]:
+        if not text:
+            return []
+        if self._encoding is not None:
+            return self._split_tokens(text)
+        return self._split_chars(text)
+
+    def _split_chars(self, text: str) -> List[str]:
+        size, overlap, length = self.chunk_size, self.chunk_overlap, len(text)
+        # Do not cut a window shorter than this just to land on a separator.
+        min_end_offset = size // 2
+        chunks = []
+        start = 0
+        while start < length:
+            end = start + size
+            if end >= length:
+                end = length
+            else:
+                for separator in _SEPARATORS:
+                    cut = text.rfind(separator, start + min_end_offset, end)
+                    if cut != -1:
+                        end = cut + len(separator)
+                        break
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                break
+
+            # Step back by the overlap, then forward to the next word so chunks do not start mid-word.
+            next_start = end - overlap
+            if overlap:
+                space = text.find(" ", next_start, end)
+                if space != -1:
+                    next_start = space + 1
+            start = max(next_start, start + 1)
+        return chunks
+
+    def _split_tokens(self, text: str) -> List[str]:
+        tokens = self._encoding.encode_ordinary(text)
+        step = self.chunk_size - self.chunk_overlap
+        chunks = []
+        for start in range(0, len(tokens), step):
+            chunk = self._encoding.decode(tokens[start:start + self.chunk_size]).strip()
+            if chunk:
+                chunks.append(chunk)
+            if start + self.chunk_size >= len(tokens):
+                break
+        return chunks
+
+
+@lru_cache(maxsize=64)
+def get_chunker(chunk_size: int, chunk_overlap: int, unit: str = CHARS, encoding_name: str = "cl100k_base") -> TextChunker:
+    """Return a shared chunker for this configuration; instances are reused across requests."""
+    return TextChunker(chunk_size, chunk_overlap, unit, encoding_name)
+
+
+def split_texts(
+    texts: List[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    unit: str = CHARS,
+    encoding_name: str = "cl100k_base",
+) -> List[List[str]]:
+    """
+    Split every text with the chunker for this configuration.
+    Module-level and argument-only so it can be shipped to the process pool.
+    """
+    chunker = get_chunker(chunk_size, chunk_overlap, unit, encoding_name)
+    return [chunker.split_text(text) for text in texts]
@@ -0,0 +1,127 @@
+# app/services/embedding_batcher.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+from app.core.logger import logger
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class BatcherStats:
+    """
+    Batch fill ratio and queue-wait counters for one batcher.
+    """
+
+    def __init__(self, max_batch_size: int):
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.texts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, size: int, waits: List[float]) -> None:
+        self.batches += 1
+        self.texts += size
+        self.total_wait += sum(waits)
+        self.max_wait = max([self.max_wait, *waits])
+
+    def snapshot(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "fill_ratio": round(self.texts / (self.batches * self.max_batch_size), 4) if self.batches else 0.0,
+            "avg_wait_ms": round(self.total_wait / self.texts * 1000, 3) if self.texts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class _Request:
+    """One caller's texts, filled in as the batches containing them complete."""
+
+    __slots__ = ("future", "vectors", "remaining")
+
+    def __init__(self, future: asyncio.Future, size: int):
+        self.future = future
+        self.vectors: List[Optional[List[float]]] = [None] * size
+        self.remaining = size
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces embedding calls from concurrent requests into provider-sized batches.
+
+    Texts are queued individually. A batch is sent as soon as `max_batch_size` texts are
+    waiting, or `max_wait` seconds after the first text of a batch arrived, whichever comes
+    first. A caller with more texts than fit in one batch is spread over several, and gets
+    its vectors back in order once all of them have completed.
+    """
+
+    def __init__(self, name: str, embed: EmbedFn, max_batch_size: int, max_wait: float):
+        self.name = name
+        self._embed = embed
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.stats = BatcherStats(self.max_batch_size)
+        # (text, owning request, index in that request, enqueued_at)
+        self._pending: List[Tuple[str, _Request, int, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight batches; the loop only keeps weak ones.
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        request = _Request(loop.create_future(), len(texts))
+        now = time.monotonic()
+        self._pending.extend((text, request, i, now) for i, text in enumerate(texts))
+
+        while len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+        return await request.future
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        while self._pending:
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Texts of callers that were cancelled while queued are not worth a provider call.
+        self._pending = [item for item in self._pending if not item[1].future.done()]
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not batch:
+            return
+        now = time.monotonic()
+        self.stats.record(len(batch), [now - enqueued_at for *_, enqueued_at in batch])
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, _Request, int, float]]) -> None:
+        try:
+            vectors = await self._embed([text for text, *_ in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"Provider returned {len(vectors)} vectors for {len(batch)} texts.")
+        except Exception as e:
+            logger.error(f"[Embedding Batcher] {self.name} batch of {len(batch)} failed: {e}")
+            for _, request, _, _ in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for (_, request, index, _), vector in zip(batch, vectors):
+            if request.future.done():
+                continue  # caller was cancelled or already failed
+            request.vectors[index] = vector
+            request.remaining -= 1
+            if request.remaining == 0:
+                request.future.set_result(request.vectors)
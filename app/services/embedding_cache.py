@@ -0,0 +1,78 @@
+# app/services/embedding_cache.py
+
+import hashlib
+from typing import List, Optional
+import numpy as np
+from app.cache import LRUCache, redis_bytes, get_cache_stats
+from app.core.config import settings
+from app.core.logger import logger
+
+KEY_PREFIX = "emb:"
+
+
+class EmbeddingCache:
+    """
+    Chunk embedding cache keyed by (embedding model, chunk text hash).
+
+    An in-process LRU sits in front of Redis. Vectors are stored as raw float32 bytes,
+    which is about a quarter of the size of the JSON float lists the providers return.
+    """
+
+    def __init__(self, max_items: int, ttl: int):
+        self.ttl = ttl
+        self.local = LRUCache(max_items=max_items)
+        self.stats = get_cache_stats("embedding")
+
+    @staticmethod
+    def _key(namespace: str, text: str) -> str:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{KEY_PREFIX}{namespace}:{digest}"
+
+    async def get_many(self, namespace: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up vectors for `texts`; missing entries come back as None.
+        Local misses are fetched from Redis in a single MGET.
+        """
+        keys = [self._key(namespace, text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [self.local.get(key) for key in keys]
+
+        remote = [i for i, vector in enumerate(vectors) if vector is None]
+        if remote:
+            try:
+                values = await redis_bytes.mget([keys[i] for i in remote])
+                for i, value in zip(remote, values):
+                    if value:
+                        vector = np.frombuffer(value, dtype=np.float32)
+                        vectors[i] = vector
+                        self.local.set(keys[i], vector)
+            except Exception as e:
+                logger.error(f"[Embedding Cache] Error reading from Redis: {e}")
+
+        for vector in vectors:
+            if vector is None:
+                self.stats.miss()
+            else:
+                self.stats.hit()
+        return vectors
+
+    async def set_many(self, namespace: str, texts: List[str], vectors: List[np.ndarray]) -> None:
+        """
+        Store freshly computed vectors locally and in Redis (one pipelined round trip).
+        """
+        try:
+            async with redis_bytes.pipeline(transaction=False) as pipe:
+                for text, vector in zip(texts, vectors):
+                    key = self._key(namespace, text)
+                    vector = np.asarray(vector, dtype=np.float32)
+                    self.local.set(key, vector)
+                    pipe.setex(key, self.ttl, vector.tobytes())
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"[Embedding Cache] Error writing to Redis: {e}")
+
+
+# ✅ Instantiate once
+embedding_cache = EmbeddingCache(
+    max_items=settings.embedding_cache_max_items,
+    ttl=settings.embedding_cache_ttl_seconds,
+)
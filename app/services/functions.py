@@ -2,7 +2,7 @@
 
 from typing import Dict, Any
 from app.core.logger import logger
-import httpx
+from app.core.http_client import get_client, SERPER
 
 # Function schema definitions (OpenAI format)
 FUNCTIONS = [
@@ -143,29 +143,28 @@ async def search_shopping(query: str) -> dict:
     """
     try:
         from app.core.config import settings
-        url = "https://google.serper.dev/shopping"
+        url = f"{settings.serper_base_url}/shopping"
         payload = {"q": query}
         headers = {
             "X-API-KEY": settings.serper_api_key,
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=10)
-            data = response.json()
-
-            if "shopping" in data and len(data["shopping"]) > 0:
-                top_product = data["shopping"][0]
-                return {
-                    "title": top_product.get("title"),
-                    "price": top_product.get("price", "N/A"),
-                    "link": top_product.get("link"),
-                    "image_url": top_product.get("imageUrl", None),
-                }
-            else:
-                return {
-                    "error": "No shopping results found."
-                }
+        response = await get_client(SERPER).post(url, headers=headers, json=payload, timeout=10)
+        data = response.json()
+
+        if "shopping" in data and len(data["shopping"]) > 0:
+            top_product = data["shopping"][0]
+            return {
+                "title": top_product.get("title"),
+                "price": top_product.get("price", "N/A"),
+                "link": top_product.get("link"),
+                "image_url": top_product.get("imageUrl", None),
+            }
+        else:
+            return {
+                "error": "No shopping results found."
+            }
     except Exception as e:
         logger.error(f"[search_shopping] Error: {e}")
         return {
@@ -186,33 +185,32 @@ async def search_news(query: str, top_k: int = 1) -> dict:
     """
     try:
         from app.core.config import settings
-        url = "https://google.serper.dev/news"
+        url = f"{settings.serper_base_url}/news"
         payload = {"q": query}
         headers = {
             "X-API-KEY": settings.serper_api_key,
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=10)
-            data = response.json()
-
-            if "news" in data and len(data["news"]) > 0:
-                articles = []
-                for article in data["news"][:top_k]:
-                    articles.append({
-                        "title": article.get("title"),
-                        "source": article.get("source", "Unknown"),
-                        "date": article.get("date", "N/A"),
-                        "link": article.get("link"),
-                        "snippet": article.get("snippet", ""),
-                    })
-                return {"articles": articles}
-            else:
-                return {
-                    "articles": [],
-                    "error": "No news articles found."
-                }
+        response = await get_client(SERPER).post(url, headers=headers, json=payload, timeout=10)
+        data = response.json()
+
+        if "news" in data and len(data["news"]) > 0:
+            articles = []
+            for article in data["news"][:top_k]:
+                articles.append({
+                    "title": article.get("title"),
+                    "source": article.get("source", "Unknown"),
+                    "date": article.get("date", "N/A"),
+                    "link": article.get("link"),
+                    "snippet": article.get("snippet", ""),
+                })
+            return {"articles": articles}
+        else:
+            return {
+                "articles": [],
+                "error": "No news articles found."
+            }
     except Exception as e:
         logger.error(f"[search_news] Error: {e}")
         return {
@@ -1,19 +1,69 @@
 # app/services/llm.py
 
-from openai import AsyncOpenAI
-from typing import List, Dict, AsyncGenerator, Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Dict, AsyncGenerator, Optional, Tuple
+import json
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import track_stage, track_upstream
+from app.core.startup import startup_report
+from app.core.tracing import current_trace
 from app.services.functions import FUNCTIONS, handle_function_call
+from app.services.llm_cache import llm_cache
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+def _record_usage(model: str, usage) -> None:
+    """Add a completion's token usage to the current request trace, if any."""
+    trace = current_trace()
+    if trace is not None and usage is not None:
+        trace.add_tokens(model, getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0))
+
+
+def _tool_summary_prompt(tool_outputs_summary: List[str]) -> List[dict]:
+    """Prompt for the second completion that turns tool outputs into the answer."""
+    return [
+        {
+            "role": "system",
+            "content": "You are an intelligent assistant. Given the following tool outputs, summarize them into a clean, readable paragraph."
+        },
+        {
+            "role": "user",
+            "content": "\n".join(tool_outputs_summary),
+        },
+    ]
+
 
 class LLMService:
     def __init__(self):
-        self.client = self._configure_client()
+        self._client: Optional["AsyncOpenAI"] = None
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """
+        The provider client, built on first use so importing this module stays cheap.
+        The app lifespan builds it up front unless FAST_STARTUP is set.
+        """
+        if self._client is None:
+            with startup_report.phase("llm_client"):
+                self._client = self._configure_client()
+        return self._client
+
+    @client.setter
+    def client(self, client: "AsyncOpenAI") -> None:
+        self._client = client
 
-    def _configure_client(self) -> AsyncOpenAI:
+    def ensure_client(self) -> "AsyncOpenAI":
+        """Build the provider client now rather than on the first request."""
+        return self.client
+
+    def _configure_client(self) -> "AsyncOpenAI":
         """
         Configure OpenAI or Groq client based on settings.
         """
+        with startup_report.phase("import openai", "import"):
+            from openai import AsyncOpenAI
+
         if settings.llm_provider.lower() == "groq":
             logger.info("[LLM] Using Groq API client.")
             return AsyncOpenAI(
@@ -24,7 +74,7 @@ class LLMService:
             logger.info("[LLM] Using OpenAI API client.")
             return AsyncOpenAI(
                 api_key=settings.openai_api_key,
-                base_url="https://api.openai.com/v1",
+                base_url=settings.openai_base_url,
             )
 
     async def stream_chat_completion(
@@ -37,11 +87,12 @@ class LLMService:
         """
         try:
             logger.info(f"[LLM] Streaming chat completion with model: {model}")
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                stream=True,
-            )
+            with track_upstream("llm"):
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                )
             async for chunk in response:
                 delta = chunk.choices[0].delta.content
                 if delta:
@@ -50,19 +101,135 @@ class LLMService:
             logger.error(f"[LLM] Error during streaming chat completion: {e}")
             raise
 
+    async def _run_tool_calls(self, tool_calls: List[Tuple[str, str]]) -> Tuple[List[str], List[dict]]:
+        """
+        Execute (function_name, arguments_json) pairs requested by the model.
+        Returns (summary_lines, tool_outputs_json).
+        """
+        tool_outputs_summary = []
+        tool_outputs_json = []
+
+        with track_stage("tools"):
+            for function_name, function_args_json in tool_calls:
+                function_args = json.loads(function_args_json) if function_args_json else {}
+
+                function_response = await handle_function_call(function_name, function_args)
+                logger.info(f"[LLM] 🔥 Function {function_name} executed successfully.")
+
+                tool_outputs_summary.append(f"- {function_response}")
+                tool_outputs_json.append({
+                    "function_name": function_name,
+                    "arguments": function_args,
+                    "response": function_response,
+                })
+
+        return tool_outputs_summary, tool_outputs_json
+
+    async def stream_chat_completion_with_tools(
+        self,
+        messages: List[dict],
+        model: str,
+        enable_function_calling: bool = False,
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream a ChatCompletion in a single pass with the tools schema attached.
+        Yields events:
+          ("text", delta)               as soon as content arrives,
+          ("tool_calls", [names])       once the stream ends, if the model asked for tools,
+          ("tool_outputs", [outputs])   after those tools have run,
+          ("text", delta)               again, streaming a summary of the tool outputs.
+        Tool-call deltas are assembled incrementally by their index while the text streams.
+        """
+        try:
+            use_functions = settings.use_function_calling and enable_function_calling
+            logger.info(f"[LLM] Streaming chat completion with model: {model} (function calling: {use_functions})")
+
+            kwargs = {
+                "model": model,
+                "messages": messages,
+                "stream": True,
+            }
+            if use_functions:
+                kwargs.update({
+                    "tools": [{"type": "function", "function": f} for f in FUNCTIONS],
+                    "tool_choice": "auto",
+                })
+            trace = current_trace()
+            if trace is not None and trace.detailed:
+                # Streams only report token usage (in a final, choice-less chunk) when asked.
+                kwargs["stream_options"] = {"include_usage": True}
+
+            with track_upstream("llm"):
+                response = await self.client.chat.completions.create(**kwargs)
+
+            # index -> {"name": ..., "arguments": ...}; both arrive in fragments.
+            tool_calls: Dict[int, Dict[str, str]] = {}
+            async for chunk in response:
+                if getattr(chunk, "usage", None):
+                    _record_usage(model, chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield "text", delta.content
+                for tool_call in getattr(delta, "tool_calls", None) or []:
+                    call = tool_calls.setdefault(tool_call.index, {"name": "", "arguments": ""})
+                    if tool_call.function is not None:
+                        call["name"] += tool_call.function.name or ""
+                        call["arguments"] += tool_call.function.arguments or ""
+
+            if tool_calls:
+                calls = [(call["name"], call["arguments"]) for _, call in sorted(tool_calls.items())]
+                logger.info(f"[LLM] ✅ {len(calls)} function call(s) detected in stream.")
+                yield "tool_calls", [name for name, _ in calls]
+                tool_outputs_summary, tool_outputs_json = await self._run_tool_calls(calls)
+                yield "tool_outputs", tool_outputs_json
+
+                # As in chat_completion, a second completion turns the tool outputs into the answer.
+                logger.info("[LLM] 📥 Streaming summarized function outputs from model...")
+                summary_kwargs = {
+                    "model": model,
+                    "messages": _tool_summary_prompt(tool_outputs_summary),
+                    "stream": True,
+                }
+                if "stream_options" in kwargs:
+                    summary_kwargs["stream_options"] = kwargs["stream_options"]
+                with track_upstream("llm"):
+                    response = await self.client.chat.completions.create(**summary_kwargs)
+                async for chunk in response:
+                    if getattr(chunk, "usage", None):
+                        _record_usage(model, chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield "text", chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"[LLM] Error during streaming chat completion with tools: {e}")
+            raise
+
     async def chat_completion(
         self,
         messages: List[dict],
         model: str,
         enable_function_calling: bool = False,
+        cache: bool = False,
     ) -> Tuple[str, Optional[List[dict]]]:
         """
         Get full ChatCompletion response.
         Handles multiple function calls with summarization.
+        With `cache`, a completion for the same (model, messages, tool settings) is reused;
+        answers that ran tools are never cached, since tool outputs are live data.
         Returns: (final_answer, tool_outputs_list)
         """
         try:
             use_functions = settings.use_function_calling and enable_function_calling
+
+            cache_key = None
+            if cache and settings.llm_cache_enabled:
+                cache_key = llm_cache.key(model, messages, use_functions)
+                cached = await llm_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"[LLM] Cache hit for chat completion with model: {model}")
+                    return cached
+
             logger.info(f"[LLM] Requesting chat completion with model: {model} (function calling: {use_functions})")
 
             kwargs = {
@@ -77,49 +244,27 @@ class LLMService:
                     "tool_choice": "auto",
                 })
 
-            response = await self.client.chat.completions.create(**kwargs)
+            with track_upstream("llm"):
+                response = await self.client.chat.completions.create(**kwargs)
+            _record_usage(model, getattr(response, "usage", None))
             choice = response.choices[0]
 
             if hasattr(choice.message, "tool_calls") and choice.message.tool_calls:
                 logger.info(f"[LLM] ✅ {len(choice.message.tool_calls)} function call(s) detected.")
 
-                tool_outputs_summary = []
-                tool_outputs_json = []
-
-                import json
-
-                for tool_call in choice.message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args_json = tool_call.function.arguments
-                    function_args = json.loads(function_args_json)
-
-                    function_response = await handle_function_call(function_name, function_args)
-                    logger.info(f"[LLM] 🔥 Function {function_name} executed successfully.")
-
-                    tool_outputs_summary.append(f"- {function_response}")
-                    tool_outputs_json.append({
-                        "function_name": function_name,
-                        "arguments": function_args,
-                        "response": function_response,
-                    })
-
-                summary_prompt = [
-                    {
-                        "role": "system",
-                        "content": "You are an intelligent assistant. Given the following tool outputs, summarize them into a clean, readable paragraph."
-                    },
-                    {
-                        "role": "user",
-                        "content": "\n".join(tool_outputs_summary),
-                    },
-                ]
+                tool_outputs_summary, tool_outputs_json = await self._run_tool_calls([
+                    (tool_call.function.name, tool_call.function.arguments)
+                    for tool_call in choice.message.tool_calls
+                ])
 
                 logger.info("[LLM] 📥 Sending summarized function outputs to model...")
-                second_response = await self.client.chat.completions.create(
-                    model=model,
-                    messages=summary_prompt,
-                    stream=False,
-                )
+                with track_upstream("llm"):
+                    second_response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=_tool_summary_prompt(tool_outputs_summary),
+                        stream=False,
+                    )
+                _record_usage(model, getattr(second_response, "usage", None))
 
                 final_content = second_response.choices[0].message.content
                 logger.info("[LLM] 🎯 Final summarized answer generated.")
@@ -128,6 +273,8 @@ class LLMService:
 
             else:
                 logger.info("[LLM] Chat completion successful without function calling.")
+                if cache_key and choice.message.content:
+                    await llm_cache.set(cache_key, choice.message.content, None)
                 return choice.message.content, None
 
         except Exception as e:
@@ -144,11 +291,12 @@ class LLMService:
                 {"role": "system", "content": "You are an intelligent assistant who uses the provided context to answer user questions."},
                 {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {user_question}"},
             ]
-            return await self.chat_completion(
-                messages=prompt,
-                model=settings.answer_model,
-                enable_function_calling=settings.use_function_calling,
-            )
+            with track_stage("answer_llm"):
+                return await self.chat_completion(
+                    messages=prompt,
+                    model=settings.answer_model,
+                    enable_function_calling=settings.use_function_calling,
+                )
         except Exception as e:
             logger.error(f"[LLM] Error generating answer text: {e}")
             return "An error occurred while generating the answer."
@@ -163,7 +311,8 @@ class LLMService:
                 {"role": "system", "content": "You are an assistant skilled at rephrasing queries for better search results."},
                 {"role": "user", "content": f"Rephrase this query to make it more precise for search engines: {user_input}"},
             ]
-            rephrased_input, _ =  await self.chat_completion(messages=prompt, model=settings.rephrase_model)
+            with track_stage("rephrase"):
+                rephrased_input, _ =  await self.chat_completion(messages=prompt, model=settings.rephrase_model, cache=True)
             return rephrased_input
         except Exception as e:
             logger.error(f"[LLM] Error during rephrasing: {e}")
@@ -179,7 +328,8 @@ class LLMService:
                 {"role": "system", "content": "Generate 3 short, relevant follow-up questions for the given query."},
                 {"role": "user", "content": user_question},
             ]
-            followup_text, _ = await self.chat_completion(messages=prompt, model=settings.followup_model)
+            with track_stage("followups"):
+                followup_text, _ = await self.chat_completion(messages=prompt, model=settings.followup_model, cache=True)
             return [q.strip() for q in followup_text.split('\n') if q.strip()]
         except Exception as e:
             logger.error(f"[LLM] Error generating follow-up questions: {e}")
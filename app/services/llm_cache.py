@@ -0,0 +1,70 @@
+# app/services/llm_cache.py
+
+import hashlib
+import json
+from typing import List, Optional, Tuple
+from app.cache import LRUCache, redis, get_cache_stats
+from app.core.config import settings
+from app.core.logger import logger
+
+KEY_PREFIX = "llm:"
+
+
+class LLMCallCache:
+    """
+    Completion cache for prompts that repeat verbatim, such as rephrasing and follow-ups.
+
+    Keyed by provider, model, the exact messages and the tool settings, so a different
+    prompt template or model never reuses an answer. An in-process LRU sits in front of Redis.
+    """
+
+    def __init__(self, max_items: int, ttl: int):
+        self.ttl = ttl
+        self.local = LRUCache(max_items=max_items, ttl=ttl)
+        self.stats = get_cache_stats("llm")
+
+    @staticmethod
+    def key(model: str, messages: List[dict], use_functions: bool) -> str:
+        payload = json.dumps(
+            {
+                "provider": settings.llm_provider.lower(),
+                "model": model,
+                "messages": messages,
+                "tools": use_functions,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Tuple[str, Optional[List[dict]]]]:
+        value = self.local.get(key)
+        if value is None:
+            try:
+                raw = await redis.get(key)
+                if raw:
+                    value = tuple(json.loads(raw))
+                    self.local.set(key, value)
+            except Exception as e:
+                logger.error(f"[LLM Cache] Error reading from Redis: {e}")
+
+        if value is None:
+            self.stats.miss()
+            return None
+        self.stats.hit()
+        return value
+
+    async def set(self, key: str, content: str, tool_outputs: Optional[List[dict]]) -> None:
+        value = (content, tool_outputs)
+        self.local.set(key, value)
+        try:
+            await redis.setex(key, self.ttl, json.dumps(value))
+        except Exception as e:
+            logger.error(f"[LLM Cache] Error writing to Redis: {e}")
+
+
+# ✅ Instantiate once
+llm_cache = LLMCallCache(
+    max_items=settings.llm_cache_max_items,
+    ttl=settings.llm_cache_ttl_seconds,
+)
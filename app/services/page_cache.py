@@ -0,0 +1,98 @@
+# app/services/page_cache.py
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.cache import redis
+from app.core.config import settings
+from app.core.logger import logger
+
+KEY_PREFIX = "page:"
+
+
+@dataclass
+class CachedPage:
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators to send when revalidating this page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    URL-keyed cache of extracted main text.
+
+    Entries are fresh for `ttl` seconds and served without touching the network. They are kept
+    in Redis for `max_age` seconds so that stale entries can still be revalidated with
+    If-None-Match / If-Modified-Since and reused on a 304.
+    """
+
+    def __init__(self, ttl: int, max_age: int):
+        self.ttl = ttl
+        self.max_age = max(max_age, ttl)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return KEY_PREFIX + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl
+
+    async def get(self, url: str) -> Optional[CachedPage]:
+        try:
+            data = await redis.hgetall(self._key(url))
+            if not data or "text" not in data:
+                return None
+            return CachedPage(
+                text=data["text"],
+                etag=data.get("etag") or None,
+                last_modified=data.get("last_modified") or None,
+                fetched_at=float(data.get("fetched_at", 0)),
+            )
+        except Exception as e:
+            logger.error(f"[Page Cache] Error reading {url}: {e}")
+            return None
+
+    async def set(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        key = self._key(url)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={
+                    "text": text,
+                    "etag": etag or "",
+                    "last_modified": last_modified or "",
+                    "fetched_at": time.time(),
+                })
+                pipe.expire(key, self.max_age)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"[Page Cache] Error writing {url}: {e}")
+
+    async def touch(self, url: str) -> None:
+        """Mark a revalidated entry fresh again."""
+        key = self._key(url)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, "fetched_at", time.time())
+                pipe.expire(key, self.max_age)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"[Page Cache] Error refreshing {url}: {e}")
+
+
+# ✅ Instantiate once
+page_cache = PageCache(
+    ttl=settings.page_cache_ttl_seconds,
+    max_age=settings.page_cache_max_age_seconds,
+)
@@ -0,0 +1,124 @@
+# app/services/pipeline.py
+
+import asyncio
+import heapq
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import track_stage
+from app.services.rag import embedding_service
+from app.services.scraper import scrape_document
+
+# (score, search rank, chunk text, page metadata)
+ScoredChunk = Tuple[float, int, str, dict]
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+async def _process_page(
+    doc,
+    rank: int,
+    query_task: "asyncio.Task[List[float]]",
+    chunk_size: Optional[int],
+    chunk_overlap: Optional[int],
+) -> List[ScoredChunk]:
+    """
+    Scrape one search result, chunk and embed it, and score its chunks against the query.
+    """
+    text, meta = await scrape_document(doc)
+    chunks, _ = await embedding_service.chunk_documents([text], [meta], chunk_size, chunk_overlap)
+    if not chunks:
+        return []
+
+    vectors = await embedding_service.embed_documents(chunks)
+    query_vector = await query_task
+    with track_stage("retrieve"):
+        matrix = np.vstack(vectors).astype(np.float32, copy=False)
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        scores = (matrix @ _unit(query_vector)) / norms
+    return [(float(score), rank, chunk, meta) for score, chunk in zip(scores, chunks)]
+
+
+async def retrieve_incrementally(
+    docs: list,
+    query: str,
+    k: int,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict]:
+    """
+    Scrape → chunk → embed → score each page as soon as its own fetch completes, instead of
+    waiting for every page at each stage.
+
+    The query is embedded alongside the fetches. Collection stops early once at least
+    settings.pipeline_min_pages pages are in and a page raises the mean of the top-k scores
+    by less than settings.pipeline_min_gain, or when `deadline` seconds (default:
+    settings.scrape_deadline_seconds) pass; pages still in flight are then cancelled.
+    The cutoff is relative because absolute cosine scores vary widely between embedding
+    models; what matters is whether more pages are still improving the context.
+    Returns the top-k chunks as {"text": ..., **page metadata}, like similarity_search.
+    """
+    if not docs:
+        return []
+    if deadline is None:
+        deadline = settings.scrape_deadline_seconds
+
+    query_task = asyncio.create_task(embedding_service.embed_query(query))
+    tasks = [
+        asyncio.create_task(_process_page(doc, rank, query_task, chunk_size, chunk_overlap))
+        for rank, doc in enumerate(docs)
+    ]
+
+    scored: List[ScoredChunk] = []
+    pages_done = 0
+    top_k_mean = float("-inf")
+    try:
+        for next_page in asyncio.as_completed(tasks, timeout=deadline if deadline and deadline > 0 else None):
+            try:
+                page_chunks = await next_page
+            except asyncio.TimeoutError:
+                raise  # as_completed reports the deadline this way
+            except Exception as e:
+                logger.error(f"[Pipeline] Failed to process a page: {e}")
+                continue
+
+            pages_done += 1
+            scored.extend(page_chunks)
+            top_k = heapq.nlargest(k, (score for score, *_ in scored))
+            if not top_k:
+                continue
+            mean = sum(top_k) / len(top_k)
+            gain, top_k_mean = mean - top_k_mean, mean
+            if pages_done >= settings.pipeline_min_pages and len(top_k) >= k and gain < settings.pipeline_min_gain:
+                logger.info(f"[Pipeline] Top-{k} mean score {top_k_mean:.3f} gained {gain:.3f} "
+                            f"after {pages_done}/{len(docs)} page(s); stopping early.")
+                break
+    except asyncio.TimeoutError:
+        logger.warning(f"[Pipeline] Deadline of {deadline}s reached after {pages_done}/{len(docs)} page(s).")
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Also collects errors of pages that finished after the cutoff, so none go unretrieved.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if not scored and not query_task.done():
+            query_task.cancel()
+
+    if query_task.done() and not query_task.cancelled() and query_task.exception() is not None:
+        # Every page failed on the same error; surface it instead of "no sources".
+        raise query_task.exception()
+    if not scored:
+        return []
+
+    # Best score first; ties go to the higher-ranked search result.
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    results = [{"text": text, **meta} for _, _, text, meta in scored[:k]]
+    logger.info(f"[Pipeline] Retrieved {len(results)} chunk(s) from {len(scored)} scored.")
+    return results
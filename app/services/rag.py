@@ -1,32 +1,71 @@
 # app/services/embedding_service.py
 
-from typing import List, Dict
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import OpenAIEmbeddings, HuggingFaceEmbeddings
-from langchain_mistralai import MistralAIEmbeddings
-from langchain_cohere import CohereEmbeddings
-from langchain_community.vectorstores import FAISS
+import asyncio
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 from app.core.config import settings
+from app.core.executor import run_cpu_bound
 from app.core.logger import logger
+from app.core.metrics import track_stage, track_upstream
+from app.core.startup import startup_report
+from app.core.tracing import current_trace
+from app.services.chunking import split_texts
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import embedding_cache
+from app.services.retriever import NumpyVectorStore
+
+VectorStore = NumpyVectorStore
+
+# Providers whose query embedding is the same call as a document embedding, so queries
+# can be batched through aembed_documents. Cohere embeds queries with a different input type.
+SYMMETRIC_QUERY_PROVIDERS = {"openai", "groq", "mistral", "ollama"}
 
 class EmbeddingService:
     def __init__(self):
-        self.splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        self.embedder = self._configure_embedder()
+        self._embedder = None
+        # Cached vectors are only valid for the provider/model that produced them.
+        self.cache_namespace = f"{settings.llm_provider.lower()}:{settings.embedding_model}"
+        self._document_batcher: Optional[EmbeddingBatcher] = None
+        self._query_batcher: Optional[EmbeddingBatcher] = None
+
+    @property
+    def embedder(self):
+        """
+        The provider embedder, built on first use so only the configured provider's package is imported.
+        The app lifespan builds it up front unless FAST_STARTUP is set.
+        """
+        if self._embedder is None:
+            with startup_report.phase("embedder"):
+                self._embedder = self._configure_embedder()
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, embedder) -> None:
+        self._embedder = embedder
+
+    def ensure_embedder(self):
+        """Build the provider embedder now rather than on the first request."""
+        return self.embedder
 
     def _configure_embedder(self):
         """
         Dynamically configure embedder based on settings.
+        Provider packages are imported here, for the configured provider only.
         """
         provider = settings.llm_provider.lower()
 
         if provider == "openai" or provider == "groq":
+            with startup_report.phase("import langchain_community.embeddings", "import"):
+                from langchain_community.embeddings import OpenAIEmbeddings
             logger.info("[Embedder] Using OpenAI Embeddings.")
             return OpenAIEmbeddings(
                 model=settings.embedding_model,
-                openai_api_key=settings.openai_api_key
+                openai_api_key=settings.openai_api_key,
+                openai_api_base=settings.openai_base_url
             )
         elif provider == "groq":
+            with startup_report.phase("import langchain_community.embeddings", "import"):
+                from langchain_community.embeddings import OpenAIEmbeddings
             logger.info("[Embedder] Using Groq (OpenAI-Compatible) Embeddings.")
             return OpenAIEmbeddings(
                 model=settings.embedding_model,
@@ -34,17 +73,23 @@ class EmbeddingService:
                 openai_api_base="https://api.groq.com/openai/v1"
             )
         elif provider == "mistral":
+            with startup_report.phase("import langchain_mistralai", "import"):
+                from langchain_mistralai import MistralAIEmbeddings
             logger.info("[Embedder] Using MistralAI Embeddings.")
             return MistralAIEmbeddings(
                 model=settings.embedding_model,  # like "mistral-embed"
                 mistral_api_key=settings.mistral_api_key
             )
         elif provider == "ollama":
+            with startup_report.phase("import langchain_community.embeddings", "import"):
+                from langchain_community.embeddings import HuggingFaceEmbeddings
             logger.info("[Embedder] Using HuggingFace Embeddings (for Ollama).")
             return HuggingFaceEmbeddings(
                 model_name=settings.embedding_model
             )
         elif provider == "cohere":
+            with startup_report.phase("import langchain_cohere", "import"):
+                from langchain_cohere import CohereEmbeddings
             logger.info("[Embedder] Using Cohere Embeddings.")
             return CohereEmbeddings(
             model=settings.embedding_model,  # Example: "embed-english-v3"
@@ -54,60 +99,173 @@ class EmbeddingService:
             logger.error(f"[Embedder] Unknown embedding provider: {provider}")
             raise ValueError(f"Unsupported embedding provider: {provider}")
 
-    def _sanitize_texts(self, texts: List) -> List[str]:
+    @staticmethod
+    def _clean_text(text) -> Optional[str]:
+        """One text stripped, with simple non-str types converted; None if nothing is left."""
+        if text is None:
+            return None
+        return (text if isinstance(text, str) else str(text)).strip() or None
+
+    @property
+    def document_batcher(self) -> EmbeddingBatcher:
+        if self._document_batcher is None:
+            self._document_batcher = EmbeddingBatcher(
+                "documents",
+                self._embed_document_batch,
+                settings.embedding_batch_max_size,
+                settings.embedding_batch_max_wait_ms / 1000,
+            )
+        return self._document_batcher
+
+    @property
+    def query_batcher(self) -> EmbeddingBatcher:
+        if self._query_batcher is None:
+            self._query_batcher = EmbeddingBatcher(
+                "queries",
+                self._embed_query_batch,
+                settings.embedding_batch_max_size,
+                settings.embedding_batch_max_wait_ms / 1000,
+            )
+        return self._query_batcher
+
+    async def _embed_document_batch(self, texts: List[str]) -> List[List[float]]:
+        with track_upstream("embeddings"):
+            return await self.embedder.aembed_documents(texts)
+
+    async def _embed_query_batch(self, queries: List[str]) -> List[List[float]]:
+        with track_upstream("embeddings"):
+            if settings.llm_provider.lower() in SYMMETRIC_QUERY_PROVIDERS:
+                return await self.embedder.aembed_documents(queries)
+            return list(await asyncio.gather(*(self.embedder.aembed_query(q) for q in queries)))
+
+    def batcher_stats_snapshot(self) -> Dict[str, dict]:
+        """Batch fill ratio and queue wait of both lanes in this worker."""
+        return {
+            batcher.name: batcher.stats.snapshot()
+            for batcher in (self._document_batcher, self._query_batcher)
+            if batcher is not None
+        }
+
+    async def warm_up(self) -> None:
         """
-        Clean the list of texts:
-        - Keep only valid non-empty strings
-        - Remove leading/trailing whitespace
-        - Auto-convert simple non-str types to str if needed
+        Pay one-off costs before the first request does: the chunking tokenizer (in the
+        CPU pool) and the provider connection, via one query embedding.
         """
-        if not isinstance(texts, list):
-            raise ValueError("Input must be a list.")
+        try:
+            with startup_report.phase("warmup_chunking"):
+                await self.chunk_texts(["Warm-up text."])
+            with startup_report.phase("warmup_embedding"):
+                await self._embed_query_batch(["warm up"])
+            logger.info("[Embedder] Warm-up complete.")
+        except Exception as e:
+            logger.error(f"[Embedder] Warm-up failed, first request will pay the cost: {e}")
 
-        cleaned = []
-        for text in texts:
-            if isinstance(text, str):
-                stripped = text.strip()
-                if stripped:
-                    cleaned.append(stripped)
-            elif text is not None:
-                stripped = str(text).strip()
-                if stripped:
-                    cleaned.append(stripped)
+    async def _embed_with_provider(self, texts: List[str]) -> List[np.ndarray]:
+        if settings.embedding_batching_enabled:
+            raw = await self.document_batcher.embed(texts)
+        else:
+            raw = await self._embed_document_batch(texts)
+        return [np.asarray(v, dtype=np.float32) for v in raw]
 
-        if not cleaned:
-            raise ValueError("[Sanitizer] No valid non-empty strings found after sanitization.")
+    async def embed_documents(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed chunks, serving repeats from the embedding cache and sending only misses to the provider.
+        With batching enabled, misses from concurrent requests share provider calls.
+        """
+        with track_stage("embed"):
+            if not settings.embedding_cache_enabled:
+                return await self._embed_with_provider(texts)
+
+            vectors = await embedding_cache.get_many(self.cache_namespace, texts)
+            missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+            if missing:
+                fresh = await self._embed_with_provider(missing)
+                await embedding_cache.set_many(self.cache_namespace, missing, fresh)
+                by_text = dict(zip(missing, fresh))
+                vectors = [by_text[text] if vector is None else vector for text, vector in zip(texts, vectors)]
 
-        logger.info(f"[Sanitizer] Cleaned {len(texts)} -> {len(cleaned)} valid text chunks.")
-        return cleaned
+        logger.info(f"[Embedder] {len(texts) - len(missing)}/{len(texts)} chunk embeddings served from cache.")
+        return vectors
 
 
-    def chunk_and_embed(self, texts: List[str], metadatas: List[dict] = None) -> FAISS:
+    async def chunk_texts(
+        self,
+        texts: List[str],
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+    ) -> List[List[str]]:
         """
-        Split texts into chunks, sanitize, embed, and return FAISS vectorstore.
+        Split each text into chunks off the event loop; size and overlap default to settings.
         """
-        try:
-            logger.info(f"[Embedder] Starting chunking and embedding of {len(texts)} documents.")
+        with track_stage("chunk"):
+            chunk_lists = await run_cpu_bound(
+                split_texts,
+                texts,
+                chunk_size or settings.chunk_size,
+                settings.chunk_overlap if chunk_overlap is None else chunk_overlap,
+                settings.chunk_unit.lower(),
+                settings.chunk_tokenizer_encoding,
+            )
+        trace = current_trace()
+        if trace is not None:
+            trace.add_count("chunks", sum(len(chunks) for chunks in chunk_lists))
+        return chunk_lists
+
 
+    async def chunk_documents(
+        self,
+        texts: List[str],
+        metadatas: List[dict] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+    ) -> Tuple[List[str], List[dict]]:
+        """
+        Sanitize texts, split them, and sanitize the chunks, keeping each chunk paired with
+        its text's metadata. Returns (chunks, metadatas), one metadata per chunk; both are
+        empty if nothing is left.
+        """
+        kept_texts, kept_meta = [], []
+        for idx, text in enumerate(texts):
             # 🛡️ Step 1: Clean initial texts before splitting
-            texts = self._sanitize_texts(texts)
-
-            all_chunks, all_meta = [], []
-            for idx, text in enumerate(texts):
-                chunks = self.splitter.split_text(text)
-                meta = (metadatas[idx] if metadatas and idx < len(metadatas) else {})
-                for c in chunks:
-                    all_chunks.append(c)
+            cleaned = self._clean_text(text)
+            if cleaned:
+                kept_texts.append(cleaned)
+                kept_meta.append(metadatas[idx] if metadatas and idx < len(metadatas) else {})
+        if not kept_texts:
+            return [], []
+
+        all_chunks, all_meta = [], []
+        chunk_lists = await self.chunk_texts(kept_texts, chunk_size, chunk_overlap)
+        for meta, chunks in zip(kept_meta, chunk_lists):
+            for chunk in chunks:
+                # 🛡️ Step 2: Clean chunks before embedding
+                cleaned = self._clean_text(chunk)
+                if cleaned:
+                    all_chunks.append(cleaned)
                     all_meta.append(meta)
+        return all_chunks, all_meta
 
-            # 🛡️ Step 2: Clean chunks before embedding
-            all_chunks = self._sanitize_texts(all_chunks)
+    async def chunk_and_embed(
+        self,
+        texts: List[str],
+        metadatas: List[dict] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+    ) -> VectorStore:
+        """
+        Split texts into chunks, sanitize, embed, and return a vectorstore.
+        Chunk size and overlap default to settings and are measured in settings.chunk_unit.
+        """
+        try:
+            logger.info(f"[Embedder] Starting chunking and embedding of {len(texts)} documents.")
 
-            store = FAISS.from_texts(
-                all_chunks,
-                embedding=self.embedder,
-                metadatas=all_meta
-            )
+            all_chunks, all_meta = await self.chunk_documents(texts, metadatas, chunk_size, chunk_overlap)
+            if not all_chunks:
+                raise ValueError("[Sanitizer] No valid non-empty strings found after sanitization.")
+            logger.info(f"[Sanitizer] Cleaned {len(texts)} texts -> {len(all_chunks)} valid text chunks.")
+
+            vectors = await self.embed_documents(all_chunks)
+            store = await self.build_store(all_chunks, vectors, all_meta)
             logger.info(f"[Embedder] Successfully embedded {len(all_chunks)} chunks.")
             return store
         except Exception as e:
@@ -115,13 +273,39 @@ class EmbeddingService:
             raise
 
 
-    def similarity_search(self, store: FAISS, query: str, k: int = 2) -> List[Dict]:
+    async def build_store(self, chunks: List[str], vectors: List[np.ndarray], metadatas: List[dict]) -> VectorStore:
+        """
+        Assemble a store from embedded chunks.
+        A NumPy brute-force store beats building a FAISS index at every per-request size
+        measured (see benchmarks/bench_retriever.py), so it is the only store.
+        """
+        return NumpyVectorStore.from_embeddings(zip(chunks, vectors), embedding=self.embedder, metadatas=metadatas)
+
+
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query string with the configured provider.
+        """
+        try:
+            if settings.embedding_batching_enabled:
+                return (await self.query_batcher.embed([text]))[0]
+            with track_upstream("embeddings"):
+                return await self.embedder.aembed_query(text)
+        except Exception as e:
+            logger.error(f"[Embedder] Error embedding query: {e}")
+            raise
+
+
+    async def similarity_search(self, store: VectorStore, query: str, k: int = 2) -> List[Dict]:
         """
         Search vectorstore for similar chunks.
+        The query is embedded once, asynchronously, and matched by vector.
         """
         try:
             logger.info(f"[Embedder] Running similarity search for query: {query}")
-            docs = store.similarity_search(query, k=k)
+            with track_stage("retrieve"):
+                query_vector = await self.embed_query(query)
+                docs = store.similarity_search_by_vector(query_vector, k=k)
             results = [{"text": doc.page_content, **doc.metadata} for doc in docs]
             logger.info(f"[Embedder] Found {len(results)} similar documents.")
             return results
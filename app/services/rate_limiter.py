@@ -0,0 +1,189 @@
+# app/services/rate_limiter.py
+
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import Request
+from redis.exceptions import NoScriptError
+from app.cache import LRUCache, redis_bytes, get_cache_stats
+from app.core.config import settings
+from app.core.logger import logger
+
+KEY_PREFIX = "rate:"
+
+# Token bucket holding up to ARGV[1] tokens, refilled continuously at ARGV[2] tokens per second.
+# Takes a lease of ARGV[3] tokens if the bucket stays at least half full afterwards, otherwise
+# one token. Atomic, timed by the Redis clock, and the key always gets a TTL.
+# Returns {tokens granted (0 when limited), milliseconds until the next token is available}.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local granted = 0
+if tokens >= 1 then
+    granted = 1
+    if lease > 1 and tokens - lease >= capacity / 2 then
+        granted = lease
+    end
+    tokens = tokens - granted
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000))
+
+local wait = 0
+if granted == 0 then
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+return {granted, wait}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """`requests` per `seconds`, allowed in a burst of up to `requests`."""
+
+    requests: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.seconds
+
+
+@lru_cache(maxsize=64)
+def parse_limit(spec: str) -> Limit:
+    """Parse "<requests>/<seconds>", e.g. "30/60" for 30 requests a minute."""
+    requests, _, seconds = spec.partition("/")
+    limit = Limit(int(requests), float(seconds or 60))
+    if limit.requests <= 0 or limit.seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return limit
+
+
+class RateLimiter:
+    """
+    Per-client token buckets in Redis, with an in-process pre-check.
+
+    The bucket is chosen per route and client: the API key, if it has its own rule in
+    RATE_LIMIT_RULES, otherwise the client IP. Requests from a client that is well under
+    its limit are served from a short-lived local lease of tokens, and a client that was
+    just limited is refused locally until its next token is due; neither touches Redis.
+    """
+
+    def __init__(self, lease_size: int, lease_ttl: float, max_items: int = 10000):
+        self.lease_size = lease_size
+        # Called by SHA (EVALSHA) so the script source is not sent with every request.
+        self._script = redis_bytes.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._leases = LRUCache(max_items=max_items, ttl=lease_ttl)
+        self._blocked = LRUCache(max_items=max_items)
+        self.stats = get_cache_stats("rate_limit_local")
+
+    @staticmethod
+    def resolve(request: Request) -> Tuple[str, Limit]:
+        """Bucket key and limit for a request."""
+        rules = settings.rate_limit_rules
+        route = request.url.path
+        api_key = request.headers.get(settings.rate_limit_api_key_header)
+        if api_key and f"key:{api_key}" in rules:
+            subject = "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+            spec = rules[f"key:{api_key}"]
+        else:
+            subject = "ip:" + (request.client.host if request.client else "unknown")
+            spec = rules.get(f"route:{route}") or f"{settings.requests_per_minute}/60"
+        return f"{KEY_PREFIX}{route}:{subject}", parse_limit(spec)
+
+    def _check_local(self, bucket: str) -> Optional[bool]:
+        """Decide from this worker's lease or block, or None if Redis has to."""
+        if self._blocked.get(bucket):
+            self.stats.hit()
+            return False
+        lease: List[int] = self._leases.get(bucket)
+        if lease and lease[0] > 0:
+            lease[0] -= 1
+            self.stats.hit()
+            return True
+        self.stats.miss()
+        return None
+
+    def _apply(self, bucket: str, granted: int, wait_ms: int) -> bool:
+        granted = int(granted)
+        if granted == 0:
+            self._blocked.set(bucket, True, ttl=max(int(wait_ms), 1) / 1000)
+            return False
+        if granted > 1:
+            self._leases.set(bucket, [granted - 1])
+        return True
+
+    async def _execute(self, bucket: str, limit: Limit, cache_key: Optional[str], local: bool) -> list:
+        """
+        Send the bucket script (unless the limit was decided locally) and the cache reads in
+        one pipeline. If Redis does not have the script yet, it is loaded and the pipeline
+        retried once.
+        """
+        for attempt in range(2):
+            async with redis_bytes.pipeline(transaction=False) as pipe:
+                if not local:
+                    pipe.evalsha(self._script.sha, 1, bucket, limit.requests, limit.rate, self.lease_size)
+                if cache_key:
+                    pipe.get(cache_key)
+                    pipe.pttl(cache_key)
+                results = await pipe.execute(raise_on_error=False)
+            if local or attempt or not isinstance(results[0], NoScriptError):
+                break
+            logger.info("[Rate Limit] Loading the token-bucket script into Redis.")
+            await redis_bytes.script_load(_TOKEN_BUCKET_SCRIPT)
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    async def allow(self, request: Request) -> bool:
+        allowed, _, _ = await self.allow_and_get(request)
+        return allowed
+
+    async def allow_and_get(
+        self, request: Request, cache_key: Optional[str] = None
+    ) -> Tuple[bool, Optional[bytes], Optional[int]]:
+        """
+        Rate-limit `request` and, if it is allowed, GET `cache_key` and its PTTL, in one Redis
+        round trip: the token-bucket script and the reads go out in the same pipeline. When
+        the limit is decided locally, only the reads are sent.
+        Returns (allowed, raw cached value, remaining TTL in milliseconds).
+        """
+        bucket, limit = self.resolve(request)
+        local = self._check_local(bucket)
+        if local is False:
+            return False, None, None
+        if local and not cache_key:
+            return True, None, None
+
+        try:
+            results = await self._execute(bucket, limit, cache_key, bool(local))
+        except Exception as e:
+            logger.error(f"[Rate Limit] Error checking {bucket}, allowing request: {e}")
+            return True, None, None
+
+        if not local and not self._apply(bucket, *results.pop(0)):
+            return False, None, None
+        if not cache_key:
+            return True, None, None
+        value, pttl = results
+        return True, value, pttl
+
+
+# ✅ Instantiate once
+rate_limiter = RateLimiter(
+    lease_size=settings.rate_limit_lease_size,
+    lease_ttl=settings.rate_limit_lease_ttl_ms / 1000,
+)
@@ -0,0 +1,63 @@
+# app/services/retriever.py
+
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+
+
+class NumpyVectorStore:
+    """
+    Throwaway in-memory vector store for small per-request chunk sets.
+
+    Keeps one contiguous float32 matrix of unit vectors and answers queries with a single
+    matrix-vector product plus a partial sort (cosine similarity). For a few hundred chunks
+    this is cheaper than building a FAISS index, docstore and id mapping. It exposes the
+    `similarity_search` / `similarity_search_by_vector` subset of the FAISS store that
+    EmbeddingService uses, so the two are interchangeable.
+    """
+
+    def __init__(self, texts: List[str], vectors: np.ndarray, metadatas: Optional[List[dict]] = None, embedding=None):
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("vectors must be a (len(texts), dim) matrix.")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.texts = texts
+        self.metadatas = metadatas or [{} for _ in texts]
+        self.embedding = embedding
+
+    @classmethod
+    def from_embeddings(
+        cls,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        embedding=None,
+        metadatas: Optional[List[dict]] = None,
+    ) -> "NumpyVectorStore":
+        """Same call shape as FAISS.from_embeddings."""
+        pairs = list(text_embeddings)
+        texts = [text for text, _ in pairs]
+        vectors = np.vstack([vector for _, vector in pairs]) if pairs else np.empty((0, 0), dtype=np.float32)
+        return cls(texts, vectors, metadatas, embedding)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Document]:
+        if not self.texts:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.matrix @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [Document(page_content=self.texts[i], metadata=self.metadatas[i]) for i in top]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        if self.embedding is None:
+            raise ValueError("No embedding model attached; use similarity_search_by_vector.")
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k=k)
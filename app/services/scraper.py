@@ -1,12 +1,35 @@
+import asyncio
+import time
 import httpx
-from bs4 import BeautifulSoup
-import re
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from app.cache import get_cache_stats
+from app.core.config import settings
+from app.core.executor import run_cpu_bound
+from app.core.http_client import get_client, WEB
 from app.core.logger import logger
+from app.core.metrics import track_stage
+from app.core.tracing import current_trace
+from app.services.extractors import get_extractor
+from app.services.page_cache import page_cache
 
+# Process-wide fetch limits, created lazily so they bind to the running loop.
+_global_semaphore: Optional[asyncio.Semaphore] = None
+# host -> [semaphore, number of tasks holding or waiting on it]
+_host_slots: Dict[str, list] = {}
 
-async def fetch_page_content(url: str, timeout: int = 10) -> str:
+
+async def fetch_page(
+    url: str,
+    timeout: Optional[float] = None,
+    conditional_headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
     """
-    Fetch raw HTML from URL asynchronously with User-Agent header.
+    Fetch URL asynchronously with User-Agent header using the shared web client.
+    `timeout` overrides the client's configured timeouts when given.
+    With `conditional_headers` (If-None-Match / If-Modified-Since), a 304 Not Modified is
+    returned as-is so the caller can reuse its cached content; any other non-2xx raises.
     """
     try:
         if not isinstance(url, str):
@@ -17,10 +40,16 @@ async def fetch_page_content(url: str, timeout: int = 10) -> str:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url, headers=headers)
+        if conditional_headers:
+            headers.update(conditional_headers)
+        response = await get_client(WEB).get(
+            url,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        if not (conditional_headers and response.status_code == 304):
             response.raise_for_status()
-            return response.text
+        return response
     except httpx.HTTPStatusError as e:
         logger.error(f"[Scraper] HTTP error while fetching {url}: {e}")
         raise
@@ -31,18 +60,23 @@ async def fetch_page_content(url: str, timeout: int = 10) -> str:
         logger.error(f"[Scraper] Unexpected error while fetching {url}: {e}")
         raise
 
-def extract_main_content(html: str) -> str:
+
+async def fetch_page_content(url: str, timeout: Optional[float] = None) -> str:
+    """
+    Fetch raw HTML from URL asynchronously with User-Agent header.
+    """
+    response = await fetch_page(url, timeout=timeout)
+    return response.text
+
+def extract_main_content(html: str, engine: Optional[str] = None) -> str:
     """
     Extract the main textual content from raw HTML.
-    Cleans unnecessary tags and logs the process.
+    Uses the engine named by `engine` (default: settings.html_extractor) and logs the process.
     """
     try:
-        logger.info(f"[Scraper] Extracting main content from HTML...")
-        soup = BeautifulSoup(html, "lxml")
-        for tag in soup(["script", "style", "head", "nav", "footer", "iframe", "img"]):
-            tag.decompose()
-        text = soup.get_text(separator=" ")
-        cleaned_text = re.sub(r"\s+", " ", text).strip()
+        extractor = get_extractor(engine or settings.html_extractor)
+        logger.info(f"[Scraper] Extracting main content from HTML with '{extractor.name}'...")
+        cleaned_text = extractor.extract(html)
         logger.info(f"[Scraper] Content extraction completed successfully.")
         return cleaned_text
     except Exception as e:
@@ -50,14 +84,126 @@ def extract_main_content(html: str) -> str:
         raise
 
 
-async def scrape_documents(docs: list) -> tuple[list, list]:
+def _get_global_semaphore() -> asyncio.Semaphore:
+    global _global_semaphore
+    if _global_semaphore is None:
+        _global_semaphore = asyncio.Semaphore(settings.scrape_max_concurrency)
+    return _global_semaphore
+
+
+@asynccontextmanager
+async def _host_slot(host: str):
+    """
+    Hold one of the per-host fetch slots.
+    Entries are dropped once no task uses them, so the table only tracks active hosts.
+    """
+    entry = _host_slots.get(host)
+    if entry is None:
+        entry = _host_slots[host] = [asyncio.Semaphore(settings.scrape_per_host_concurrency), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and _host_slots.get(host) is entry:
+            del _host_slots[host]
+
+
+async def scrape_document(doc) -> tuple[str, dict]:
+    """
+    Fetch and extract a single search result, honoring the per-host and global limits.
+    """
+    url = str(doc.link)
+    trace = current_trace()
+    start = time.perf_counter()
+    try:
+        with track_stage("scrape"):
+            text = await fetch_page_text(url)
+    except Exception as e:
+        if trace is not None:
+            trace.add_page(url, time.perf_counter() - start, error=str(e) or type(e).__name__)
+        raise
+    if trace is not None:
+        trace.add_page(url, time.perf_counter() - start)
+    return text, {"title": doc.title, "link": url}
+
+
+async def fetch_page_text(url: str) -> str:
+    """
+    Return the extracted main text of `url`, going through the page cache.
+    Fresh entries are served directly; stale ones are revalidated with the stored
+    ETag / Last-Modified and reused on a 304.
+    """
+    cached = None
+    if settings.page_cache_enabled:
+        cached = await page_cache.get(url)
+        if cached is not None and page_cache.is_fresh(cached):
+            get_cache_stats("page").hit()
+            logger.info(f"[Scraper] Page cache hit: {url}")
+            return cached.text
+        get_cache_stats("page").miss()
+
+    conditional = cached.conditional_headers() if cached is not None else {}
+    host = urlsplit(url).hostname or ""
+    # Take the host slot first so a task queued behind a busy host does not pin a global slot.
+    async with _host_slot(host):
+        async with _get_global_semaphore():
+            response = await fetch_page(url, conditional_headers=conditional)
+
+    if response.status_code == 304:
+        get_cache_stats("page_revalidation").hit()
+        logger.info(f"[Scraper] Page not modified, reusing cached text: {url}")
+        await page_cache.touch(url)
+        return cached.text
+    if conditional:
+        get_cache_stats("page_revalidation").miss()
+
+    with track_stage("extract"):
+        text = await run_cpu_bound(extract_main_content, response.text)
+    if settings.page_cache_enabled:
+        await page_cache.set(
+            url,
+            text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return text
+
+
+async def scrape_documents(docs: list, deadline: Optional[float] = None) -> tuple[list, list]:
+    """
+    Scrape search results concurrently.
+    Pages that are not done within `deadline` seconds (default: settings.scrape_deadline_seconds)
+    are cancelled; whatever finished is returned in the original search-rank order.
+    """
+    if not docs:
+        return [], []
+
+    if deadline is None:
+        deadline = settings.scrape_deadline_seconds
+
+    tasks: List[asyncio.Task] = [asyncio.create_task(scrape_document(doc)) for doc in docs]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline if deadline and deadline > 0 else None)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if pending:
+        logger.warning(f"[Scraper] Deadline of {deadline}s reached, dropping {len(pending)} unfinished page(s).")
+        await asyncio.gather(*pending, return_exceptions=True)
+
     scraped_texts, metadatas = [], []
-    for doc in docs:
-        try:
-            content = await fetch_page_content(str(doc.link))
-            text = extract_main_content(content)
-            scraped_texts.append(text)
-            metadatas.append({"title": doc.title, "link": str(doc.link)})
-        except Exception as e:
-            logger.error(f"[Answer Service] Failed to scrape {doc.link}: {e}")
-    return scraped_texts, metadatas
\ No newline at end of file
+    for doc, task in zip(docs, tasks):
+        if task not in done:
+            continue
+        exc = task.exception()
+        if exc is not None:
+            logger.error(f"[Answer Service] Failed to scrape {doc.link}: {exc}")
+            continue
+        text, meta = task.result()
+        scraped_texts.append(text)
+        metadatas.append(meta)
+    return scraped_texts, metadatas
@@ -0,0 +1,186 @@
+# app/services/search_router.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import record_search_outcome, record_search_route
+from app.services.search import brave_search, serper_search, SearchResult
+
+SearchFn = Callable[[str, int], Awaitable[List[SearchResult]]]
+
+
+class ProviderHealth:
+    """
+    EWMA latency and error rate of one search provider, plus routing counters.
+    """
+
+    def __init__(self, name: str, alpha: float):
+        self.name = name
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.ewma_error = 0.0
+        self.last_failure = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.primary = 0    # times routed to first
+        self.hedges = 0     # times started as a hedge after the primary was slow
+        self.failovers = 0  # times started because an earlier provider failed
+        self.wins = 0       # times its result was the one returned
+
+    def _observe_latency(self, seconds: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency += self.alpha * (seconds - self.ewma_latency)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.requests += 1
+        self._observe_latency(seconds)
+        self.ewma_error += self.alpha * ((0.0 if ok else 1.0) - self.ewma_error)
+        if not ok:
+            self.errors += 1
+            self.last_failure = time.monotonic()
+
+    def record_abandoned(self, seconds: float) -> None:
+        """
+        A call cancelled because another provider answered first. Its latency is at least
+        `seconds`; counting that keeps a primary that keeps losing hedges from looking fast.
+        """
+        self._observe_latency(seconds)
+
+    def degraded(self) -> bool:
+        # After search_router_retry_seconds without a new failure the provider gets another chance.
+        return (
+            self.ewma_error >= settings.search_router_error_threshold
+            and time.monotonic() - self.last_failure < settings.search_router_retry_seconds
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            "error_rate": round(self.ewma_error, 4),
+            "degraded": self.degraded(),
+            "requests": self.requests,
+            "errors": self.errors,
+            "primary": self.primary,
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "wins": self.wins,
+        }
+
+
+class SearchRouter:
+    """
+    Routes a query across the configured search providers.
+
+    The preferred provider (settings.search_provider) goes first unless it is degraded or
+    its EWMA latency is more than search_router_latency_ratio times another's. If the first
+    provider has not answered after search_hedge_delay_ms, the next one is started as a hedge
+    and the first non-empty result wins; a provider that errors or returns nothing fails
+    over to the next immediately. Losing calls are cancelled.
+    """
+
+    def __init__(self, providers: Dict[str, SearchFn]):
+        self.providers = providers
+        self.health = {name: ProviderHealth(name, settings.search_router_ewma_alpha) for name in providers}
+
+    def _available(self) -> List[str]:
+        keys = {"serper": settings.serper_api_key, "brave": settings.brave_search_api_key}
+        return [name for name in self.providers if keys.get(name, "x")]
+
+    def route(self) -> List[str]:
+        """Providers in the order they should be tried."""
+        preferred = settings.search_provider.lower()
+        names = self._available()
+        # Preferred first, then by observed latency; degraded providers go last.
+        names.sort(key=lambda name: (
+            self.health[name].degraded(),
+            name != preferred,
+            self.health[name].ewma_latency or 0.0,
+        ))
+
+        if len(names) > 1 and not self.health[names[0]].degraded():
+            first, second = self.health[names[0]], self.health[names[1]]
+            if (
+                not second.degraded()
+                and first.ewma_latency is not None
+                and second.ewma_latency is not None
+                and first.ewma_latency > second.ewma_latency * settings.search_router_latency_ratio
+            ):
+                names[0], names[1] = names[1], names[0]
+        return names
+
+    async def _call(self, name: str, query: str, count: int) -> List[SearchResult]:
+        health = self.health[name]
+        start = time.monotonic()
+        try:
+            results = await self.providers[name](query, count)
+        except asyncio.CancelledError:
+            health.record_abandoned(time.monotonic() - start)
+            record_search_outcome(name, "abandoned", time.monotonic() - start)
+            raise
+        except Exception:
+            health.record(time.monotonic() - start, ok=False)
+            record_search_outcome(name, "error", time.monotonic() - start)
+            raise
+        health.record(time.monotonic() - start, ok=True)
+        record_search_outcome(name, "ok" if results else "empty", time.monotonic() - start)
+        return results
+
+    async def search(self, query: str, count: int = 4) -> List[SearchResult]:
+        order = self.route()
+        if not order:
+            logger.error("[Search Router] No search provider is configured.")
+            return []
+
+        hedge_delay = settings.search_hedge_delay_ms / 1000
+        remaining = list(order)
+        pending: Dict[asyncio.Task, str] = {}
+
+        def launch(reason: str) -> None:
+            name = remaining.pop(0)
+            counter = {"primary": "primary", "hedge": "hedges", "failover": "failovers"}[reason]
+            setattr(self.health[name], counter, getattr(self.health[name], counter) + 1)
+            record_search_route(name, reason)
+            if reason != "primary":
+                logger.info(f"[Search Router] Starting {name} as {reason} for query: {query}")
+            pending[asyncio.create_task(self._call(name, query, count))] = name
+
+        launch("primary")
+        try:
+            while pending:
+                timeout = hedge_delay if remaining and hedge_delay > 0 else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch("hedge")
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is not None:
+                        logger.warning(f"[Search Router] {name} failed: {task.exception()}")
+                        continue
+                    results = task.result()
+                    if results:
+                        self.health[name].wins += 1
+                        return results
+                    logger.warning(f"[Search Router] {name} returned no results")
+
+                if not pending and remaining:
+                    launch("failover")
+            return []
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict:
+        return {
+            "route": self.route(),
+            "providers": {name: health.snapshot() for name, health in self.health.items()},
+        }
+
+
+# ✅ Instantiate once
+search_router = SearchRouter({"serper": serper_search, "brave": brave_search})
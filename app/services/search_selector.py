@@ -1,32 +1,97 @@
-from app.services.search import brave_search, serper_search
+from app.services.search import brave_search, serper_search, SearchResult
+from app.services.search_router import search_router
+from app.cache import redis, get_cache_stats
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import track_stage
+from typing import List, Optional
+import hashlib
+import json
+
+SEARCH_CACHE_PREFIX = "search:"
+# Cache namespace for results picked by the search router rather than a fixed provider.
+ROUTED = "routed"
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _search_cache_key(provider: str, query: str, count: int) -> str:
+    digest = hashlib.sha256(_normalize_query(query).encode("utf-8")).hexdigest()
+    return f"{SEARCH_CACHE_PREFIX}{provider}:{count}:{digest}"
+
+
+async def get_cached_search(provider: str, query: str, count: int) -> Optional[List[SearchResult]]:
+    stats = get_cache_stats("search")
+    try:
+        value = await redis.get(_search_cache_key(provider, query, count))
+        if value:
+            stats.hit()
+            logger.info(f"[Search Selector] Cache hit for {provider} query: {query}")
+            return [SearchResult(**item) for item in json.loads(value)]
+        stats.miss()
+        return None
+    except Exception as e:
+        logger.error(f"[Search Selector] Error reading search cache: {e}")
+        return None
+
+
+async def set_cached_search(provider: str, query: str, count: int, results: List[SearchResult]) -> None:
+    try:
+        payload = json.dumps([r.model_dump(mode="json") for r in results])
+        await redis.setex(_search_cache_key(provider, query, count), settings.search_cache_ttl_seconds, payload)
+    except Exception as e:
+        logger.error(f"[Search Selector] Error writing search cache: {e}")
+
 
 async def search_selector(query: str, count: int = 4):
     """
     Select search provider dynamically based on settings.
+    With the search router enabled, providers are picked, hedged and failed over by latency and health.
     """
     try:
-        provider = settings.search_provider.lower()
-
-        if provider == "serper":
-            logger.info(f"[Search Selector] Using Serper search first for query: {query}")
-            results = await serper_search(query, count)
-            if not results:
-                logger.warning(f"[Search Selector] Serper returned no results")
-                # results = await brave_search(query, count)
-
-        elif provider == "brave":
-            logger.info(f"[Search Selector] Using Brave search first for query: {query}")
-            results = await brave_search(query, count)
-            if not results:
-                logger.warning(f"[Search Selector] Brave returned no results")
-                # results = await serper_search(query, count)
-        else:
-            logger.error(f"[Search Selector] Invalid search engine provider: {provider}")
-            return []
-
-        return results
+        with track_stage("search"):
+            provider = settings.search_provider.lower()
+
+            if settings.search_router_enabled:
+                # Results from any provider answer the query, so they share one cache entry.
+                if settings.search_cache_enabled:
+                    cached = await get_cached_search(ROUTED, query, count)
+                    if cached is not None:
+                        return cached
+                results = await search_router.search(query, count)
+                if results and settings.search_cache_enabled:
+                    await set_cached_search(ROUTED, query, count, results)
+                return results
+
+            if provider in ("serper", "brave") and settings.search_cache_enabled:
+                cached = await get_cached_search(provider, query, count)
+                if cached is not None:
+                    return cached
+
+            if provider == "serper":
+                logger.info(f"[Search Selector] Using Serper search first for query: {query}")
+                results = await serper_search(query, count)
+                if not results:
+                    logger.warning(f"[Search Selector] Serper returned no results")
+                    # results = await brave_search(query, count)
+
+            elif provider == "brave":
+                logger.info(f"[Search Selector] Using Brave search first for query: {query}")
+                results = await brave_search(query, count)
+                if not results:
+                    logger.warning(f"[Search Selector] Brave returned no results")
+                    # results = await serper_search(query, count)
+            else:
+                logger.error(f"[Search Selector] Invalid search engine provider: {provider}")
+                return []
+
+            # Empty result sets are not cached so a transient provider hiccup is retried next time.
+            if results and settings.search_cache_enabled:
+                await set_cached_search(provider, query, count, results)
+
+            return results
 
     except Exception as e:
         logger.error(f"[Search Selector] Search failed: {e}")
@@ -0,0 +1,184 @@
+# app/services/singleflight.py
+
+import asyncio
+import hashlib
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+from app.cache import answer_cache_key, redis, get_cache_stats
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.schemas import AnswerRequest
+
+T = TypeVar("T")
+
+LOCK_PREFIX = "flight:"
+
+# Delete the lock only if this worker still owns it; it may have expired and been re-taken.
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def flight_key(endpoint_request: AnswerRequest) -> str:
+    """
+    Identity of an /answer request for coalescing: the normalized message plus every
+    option that changes the answer. `stream` and `include_trace` are left out; they do not.
+    """
+    options = endpoint_request.model_dump(exclude={"message", "stream", "include_trace"})
+    payload = json.dumps({"message": answer_cache_key(endpoint_request.message), **options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    In-process duplicate suppression: concurrent calls with the same key share one run.
+
+    The first caller (the leader) starts the work as a task; later callers await the same
+    task. The task is shielded, so a caller that goes away does not cancel it for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = get_cache_stats(name)
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.stats.miss()
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.stats.hit()
+            logger.info(f"[Single Flight] Joining in-flight {self.name} request {key[:12]}")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an error nobody awaited is not reported as lost
+
+
+class _Broadcast:
+    """Buffer of one producer's chunks that any number of subscribers can replay and follow."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def run(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            logger.error(f"[Single Flight] Shared stream failed: {e}")
+        finally:
+            self.done = True
+            self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            # Grab the event before draining so a chunk added mid-drain still wakes us.
+            changed = self._changed
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class StreamFlight:
+    """
+    Streaming counterpart of SingleFlight: the leader's generator runs once as a task and
+    every identical request, the leader's included, reads from its buffer. Late joiners
+    replay what was already sent, then follow the live tokens.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = get_cache_stats(name)
+        self._streams: Dict[str, _Broadcast] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def stream(self, key: str, make_source: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.stats.miss()
+            broadcast = self._streams[key] = _Broadcast()
+            task = asyncio.create_task(broadcast.run(make_source()))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, broadcast))
+        else:
+            self.stats.hit()
+            logger.info(f"[Single Flight] Joining in-flight {self.name} stream {key[:12]}")
+        return broadcast.subscribe()
+
+    def _forget(self, key: str, broadcast: _Broadcast) -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+            del self._tasks[key]
+
+
+@asynccontextmanager
+async def flight_lock(key: str):
+    """
+    Cross-worker leadership for `key` via `SET NX PX`. Yields True if this worker should run
+    the pipeline (it took the lock, or Redis is unavailable) and False if another worker holds it.
+    """
+    lock_key = LOCK_PREFIX + key
+    token = uuid.uuid4().hex
+    try:
+        acquired = await redis.set(lock_key, token, nx=True, px=settings.singleflight_lock_ttl_seconds * 1000)
+    except Exception as e:
+        logger.error(f"[Single Flight] Could not take lock, running without it: {e}")
+        acquired, token = True, None
+
+    try:
+        yield bool(acquired)
+    finally:
+        if acquired and token:
+            try:
+                await redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.error(f"[Single Flight] Could not release lock {lock_key}: {e}")
+
+
+async def wait_for_flight(key: str) -> bool:
+    """
+    Poll until the worker holding the lock for `key` releases it (having written the answer
+    cache) or singleflight_wait_seconds pass. Returns True if the lock was released.
+    """
+    lock_key = LOCK_PREFIX + key
+    interval = settings.singleflight_poll_interval_ms / 1000
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.singleflight_wait_seconds
+    while loop.time() < deadline:
+        try:
+            if not await redis.exists(lock_key):
+                return True
+        except Exception as e:
+            logger.error(f"[Single Flight] Could not poll lock {lock_key}: {e}")
+            return False
+        await asyncio.sleep(interval)
+    logger.warning(f"[Single Flight] Gave up waiting for {lock_key} after {settings.singleflight_wait_seconds}s")
+    return False
+
+
+# ✅ Instantiate once
+answer_flight = SingleFlight("singleflight")
+stream_flight = StreamFlight("singleflight_stream")
@@ -1,9 +1,21 @@
-from app.cache import rate_limit
+from typing import Optional, Tuple
+from fastapi import Request
+from app.cache import answer_cache_key, decode_cached_answer, get_local_answer
 from app.core.logger import logger
-from app.core.config import settings
+from app.services.rate_limiter import rate_limiter
 
-async def rate_limit_check(client_ip: str) -> bool:
-    if await rate_limit(f"rate:{client_ip}") > settings.requests_per_minute:
-        logger.warning(f"[Answer Service] Rate limit exceeded for IP: {client_ip}")
-        return False
-    return True
\ No newline at end of file
+async def rate_limit_and_get_cached(request: Request, query: str) -> Tuple[bool, Optional[dict]]:
+    """
+    Rate-limit check plus answer-cache lookup for `query`, in a single Redis round trip.
+    An answer in the in-process tier skips the Redis GET, and with a local rate-limit
+    decision as well the request never leaves the process.
+    Returns (allowed, cached answer or None).
+    """
+    cached = get_local_answer(query)
+    allowed, value, pttl = await rate_limiter.allow_and_get(request, None if cached is not None else answer_cache_key(query))
+    if not allowed:
+        logger.warning(f"[Answer Service] Rate limit exceeded for IP: {request.client.host if request.client else 'unknown'}")
+        return False, None
+    if cached is not None:
+        return True, cached
+    return True, decode_cached_answer(query, value, pttl)
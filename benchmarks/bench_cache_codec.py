@@ -0,0 +1,139 @@
+# benchmarks/bench_cache_codec.py
+
+"""
+Cached-answer encoding: bytes per entry and encode / decode time, per codec configuration.
+
+Compares the format used before CacheCodec (a recursive str() walk plus json.dumps text)
+with every serializer / compression pair whose package is installed, on answers built
+from the bundled corpus pages. "decode+model" adds the AnswerResponse(**cached) the
+answer service does on a hit.
+
+With --redis-url, each encoded value is also written to that Redis and its MEMORY USAGE
+reported (keys are deleted afterwards); otherwise only the payload size is shown.
+
+    python -m benchmarks.bench_cache_codec
+    python -m benchmarks.bench_cache_codec --answer-chars 500 2000 8000 --threshold 512
+    python -m benchmarks.bench_cache_codec --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.core.codec import COMPRESSIONS, SERIALIZERS, CacheCodec
+from app.models.schemas import AnswerResponse, Source
+from benchmarks.corpus import load_corpus
+
+
+def _legacy_serialize(obj):
+    """The recursive helper set_cached_answer used before CacheCodec, kept verbatim for comparison."""
+    if isinstance(obj, dict):
+        return {k: _legacy_serialize(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_legacy_serialize(item) for item in obj]
+    elif hasattr(obj, "model_dump"):
+        return _legacy_serialize(obj.model_dump())
+    elif hasattr(obj, "__str__"):
+        return str(obj)
+    return obj
+
+
+def _answer(text: str, chars: int, sources: int) -> dict:
+    response = AnswerResponse(
+        answer=text[:chars],
+        sources=[
+            Source(title=f"Result {i}: {text[i * 40:i * 40 + 60].strip()}", link=f"https://news.example.com/2024/05/article-{i}?ref=search")
+            for i in range(sources)
+        ],
+        follow_up_questions=[
+            "What are the main criticisms of this approach?",
+            "How has this changed over the last decade?",
+            "Which sources disagree, and why?",
+        ],
+    )
+    return response.model_dump(exclude={"trace"})
+
+
+def _best(fn: Callable[[], object], repeat: int, number: int) -> float:
+    """Best per-call seconds over `repeat` runs of `number` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _memory_usage(client, key: str, payload: bytes) -> Optional[int]:
+    if client is None:
+        return None
+    client.set(key, payload)
+    try:
+        return client.memory_usage(key)
+    finally:
+        client.delete(key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answer-chars", type=int, nargs="+", default=[600, 2500, 8000], help="Answer text lengths")
+    parser.add_argument("--sources", type=int, default=6)
+    parser.add_argument("--threshold", type=int, default=1024, help="Compression threshold in bytes")
+    parser.add_argument("--level", type=int, default=3, help="zstd level")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--redis-url", default="", help="Also report MEMORY USAGE from this Redis")
+    args = parser.parse_args()
+
+    text = " ".join(
+        " ".join(BeautifulSoup(html, "html.parser").get_text(" ").split())
+        for _, html in load_corpus(sizes=())
+    )
+    client = None
+    if args.redis_url:
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+
+    configs: List[tuple] = []
+    skipped = []
+    for serializer in SERIALIZERS:
+        for compression in COMPRESSIONS:
+            codec = CacheCodec(1, serializer, compression, args.threshold, args.level)
+            # CacheCodec falls back when a package is missing; only measure what was asked for.
+            if (codec.serializer, codec.compression) == (serializer, compression):
+                configs.append((f"{serializer}+{compression}", codec))
+            else:
+                skipped.append(f"{serializer}+{compression}")
+
+    for chars in args.answer_chars:
+        value = _answer(text, chars, args.sources)
+        print(f"\n== answer of {chars} chars, {args.sources} sources")
+        print(f"{'format':<18}{'bytes':>8}{'redis':>8}{'encode us':>11}{'decode us':>11}{'decode+model us':>17}")
+
+        legacy = json.dumps(_legacy_serialize(value))
+        legacy_bytes = legacy.encode("utf-8")
+        encode = _best(lambda: json.dumps(_legacy_serialize(value)), args.repeat, args.number)
+        decode = _best(lambda: json.loads(legacy), args.repeat, args.number)
+        # The old format stored tool_outputs=None as "None", which fails validation; restore the None.
+        model = _best(lambda: AnswerResponse(**{**json.loads(legacy), "tool_outputs": None}), args.repeat, args.number)
+        memory = _memory_usage(client, "bench:codec:legacy", legacy_bytes)
+        print(f"{'legacy json text':<18}{len(legacy_bytes):>8}{memory or '-':>8}{encode * 1e6:>11.1f}{decode * 1e6:>11.1f}{model * 1e6:>17.1f}")
+
+        for name, codec in configs:
+            payload = codec.encode(value)
+            encode = _best(lambda: codec.encode(value), args.repeat, args.number)
+            decode = _best(lambda: codec.decode(payload), args.repeat, args.number)
+            model = _best(lambda: AnswerResponse(**codec.decode(payload)), args.repeat, args.number)
+            memory = _memory_usage(client, f"bench:codec:{name}", payload)
+            print(f"{name:<18}{len(payload):>8}{memory or '-':>8}{encode * 1e6:>11.1f}{decode * 1e6:>11.1f}{model * 1e6:>17.1f}")
+
+    if skipped:
+        print(f"\nSkipped (package not installed): {', '.join(skipped)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_chunking.py
+
+"""
+Compare the TextChunker engine with LangChain's RecursiveCharacterTextSplitter.
+
+Texts are the corpus pages after main-content extraction (the input chunk_and_embed sees).
+Reports MB/sec, chunks/sec, chunk count and mean chunk length per splitter.
+
+    python -m benchmarks.bench_chunking
+    python -m benchmarks.bench_chunking --chunk-size 500 --chunk-overlap 50 --repeat 10
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from app.services.chunking import CHARS, TOKENS, TextChunker
+from app.services.extractors import get_extractor
+from benchmarks.corpus import SYNTHETIC_SIZES, load_corpus
+
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+except ImportError:  # newer LangChain releases moved the splitters out
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+def _bench(split: Callable[[str], List[str]], texts: List[str], repeat: int):
+    chunks = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        chunks = [chunk for text in texts for chunk in split(text)]
+    elapsed = time.perf_counter() - start
+    return elapsed / repeat, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--token-chunk-size", type=int, default=256, help="Chunk size for the token-measured rows")
+    parser.add_argument("--token-chunk-overlap", type=int, default=32)
+    parser.add_argument("--encoding", default="cl100k_base")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus-dir", default="", help="Directory of *.html files (default: bundled pages)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SYNTHETIC_SIZES))
+    args = parser.parse_args()
+
+    extractor = get_extractor("lxml")
+    pages = load_corpus(Path(args.corpus_dir) if args.corpus_dir else None, tuple(args.sizes))
+    texts = [extractor.extract(html) for _, html in pages]
+    total_mb = sum(len(text) for text in texts) / 1e6
+    print(f"Input: {len(texts)} extracted pages, {total_mb:.1f} M characters, {args.repeat} pass(es)\n")
+
+    splitters = [
+        (f"langchain chars {args.chunk_size}/{args.chunk_overlap}",
+         RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap).split_text),
+        (f"chunker   chars {args.chunk_size}/{args.chunk_overlap}",
+         TextChunker(args.chunk_size, args.chunk_overlap, CHARS).split_text),
+    ]
+    try:
+        splitters += [
+            (f"langchain tokens {args.token_chunk_size}/{args.token_chunk_overlap}",
+             RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+                 encoding_name=args.encoding,
+                 chunk_size=args.token_chunk_size,
+                 chunk_overlap=args.token_chunk_overlap,
+             ).split_text),
+            (f"chunker   tokens {args.token_chunk_size}/{args.token_chunk_overlap}",
+             TextChunker(args.token_chunk_size, args.token_chunk_overlap, TOKENS, args.encoding).split_text),
+        ]
+    except Exception as e:
+        print(f"(skipping token rows: could not load tiktoken encoding '{args.encoding}': {e})\n")
+
+    print(f"{'splitter':<30}{'MB/s':>10}{'chunks/s':>12}{'chunks':>10}{'mean len':>10}")
+    for name, split in splitters:
+        seconds, chunks = _bench(split, texts, args.repeat)
+        mean_len = sum(len(chunk) for chunk in chunks) / len(chunks) if chunks else 0
+        print(f"{name:<30}{total_mb / seconds:>10.1f}{len(chunks) / seconds:>12.0f}{len(chunks):>10}{mean_len:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
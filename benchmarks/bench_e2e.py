@@ -0,0 +1,296 @@
+# benchmarks/bench_e2e.py
+
+"""
+End-to-end /answer latency and throughput against local stand-ins for every upstream.
+
+Starts benchmarks.fake_services and the app (uvicorn app.main:app) as subprocesses, with the
+app's OpenAI, Serper and Brave base URLs pointed at the stand-ins. It then sends --requests
+/answer calls per mode at --concurrency and reports:
+
+- p50/p95/p99 end-to-end latency and throughput;
+- time to first byte and to first answer token, for streaming;
+- per-stage latency, from the request trace (include_trace).
+
+The app still needs the Redis at REDIS_URL for its caches and rate limiter. Each run uses fresh
+questions, so the answer, search and page caches start cold. Use --distinct to cycle through
+fewer questions and measure warm caches. --tools turns on function calling and has the model
+call a tool for every question; each streamed answer must then end with tool JSON that parses.
+
+    python -m benchmarks.bench_e2e
+    python -m benchmarks.bench_e2e --requests 200 --concurrency 16 --modes json
+    python -m benchmarks.bench_e2e --tools --modes stream
+    python -m benchmarks.bench_e2e --llm-latency-ms 800 --page-latency-ms 400 --app-env SCRAPE_DEADLINE_SECONDS=2
+    python -m benchmarks.bench_e2e --app-url http://127.0.0.1:8000   # an app already pointed at the stand-ins
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_services import TOOL_TRIGGER, add_profile_arguments, profile_from_args, profile_to_argv
+
+TRACE_FRAME = "###TRACE### "
+TOOL_FRAME = "###TOOL_OUTPUT### "
+
+
+@dataclass
+class Sample:
+    ok: bool
+    seconds: float
+    ttfb: Optional[float] = None
+    first_token: Optional[float] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stage_windows(trace: dict) -> Dict[str, float]:
+    """Seconds per stage, from its first span start to its last span end."""
+    windows: Dict[str, List[float]] = {}
+    for span in trace.get("spans", []):
+        start, end = span["start_ms"], span["start_ms"] + span["duration_ms"]
+        window = windows.setdefault(span["stage"], [start, end])
+        window[0], window[1] = min(window[0], start), max(window[1], end)
+    return {stage: (end - start) / 1000 for stage, (start, end) in windows.items()}
+
+
+def _has_answer_text(text: str) -> bool:
+    """True once the stream carries anything besides ###ACTIVITY### and similar frames."""
+    return any(line.strip() and not line.startswith("###") for line in text.splitlines())
+
+
+async def _wait_healthy(url: str, process: Optional[subprocess.Popen], timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"process serving {url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def _one_json(client: httpx.AsyncClient, url: str, payload: dict, tools: bool = False) -> Sample:
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+        seconds = time.perf_counter() - start
+        body = response.json()
+        ok = response.status_code == 200 and "error occurred" not in body.get("answer", "")
+        ok = ok and (bool(body.get("tool_outputs")) or not tools)
+        return Sample(ok, seconds, stages=_stage_windows(body.get("trace") or {}))
+    except (httpx.HTTPError, ValueError):
+        return Sample(False, time.perf_counter() - start)
+
+
+async def _one_stream(client: httpx.AsyncClient, url: str, payload: dict, tools: bool = False) -> Sample:
+    start = time.perf_counter()
+    ttfb = first_token = None
+    body = []
+    try:
+        async with client.stream("POST", url, json={**payload, "stream": True}) as response:
+            async for chunk in response.aiter_text():
+                now = time.perf_counter() - start
+                ttfb = now if ttfb is None else ttfb
+                body.append(chunk)
+                if first_token is None and _has_answer_text("".join(body)):
+                    first_token = now
+            ok = response.status_code == 200
+    except httpx.HTTPError:
+        return Sample(False, time.perf_counter() - start)
+
+    seconds = time.perf_counter() - start
+    text = "".join(body)
+    tool_outputs = None
+    if TOOL_FRAME in text:
+        # The web client parses everything after this marker as JSON, so nothing may follow it.
+        text, _, raw = text.partition(TOOL_FRAME)
+        try:
+            tool_outputs = json.loads(raw)
+        except ValueError:
+            ok = False
+    trace = {}
+    if TRACE_FRAME in text:
+        text, _, raw = text.rpartition(TRACE_FRAME)
+        try:
+            trace = json.loads(raw)
+        except ValueError:
+            pass
+    ok = ok and "error occurred" not in text and (bool(tool_outputs) or not tools)
+    return Sample(ok, seconds, ttfb, first_token, _stage_windows(trace))
+
+
+async def _run_mode(
+    mode: str, app_url: str, questions: List[str], concurrency: int, timeout: float, tools: bool = False
+) -> tuple:
+    one = _one_stream if mode == "stream" else _one_json
+    url = f"{app_url}/answer"
+    queue: asyncio.Queue = asyncio.Queue()
+    for question in questions:
+        queue.put_nowait(question)
+    samples: List[Sample] = []
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        async def worker() -> None:
+            while not queue.empty():
+                question = queue.get_nowait()
+                samples.append(await one(client, url, {"message": question, "include_trace": True}, tools))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    return samples, wall
+
+
+def _ms(values: List[float]) -> str:
+    if not values:
+        return f"{'-':>8}{'-':>8}{'-':>8}"
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+    return f"{p50:>8.0f}{p95:>8.0f}{p99:>8.0f}"
+
+
+def _report(mode: str, samples: List[Sample], wall: float) -> None:
+    ok = [s for s in samples if s.ok]
+    print(f"\n== {mode}: {len(ok)}/{len(samples)} ok, {len(ok) / wall:.2f} req/s over {wall:.1f}s")
+    print(f"{'':<16}{'p50':>8}{'p95':>8}{'p99':>8}   (ms)")
+    print(f"{'end-to-end':<16}{_ms([s.seconds for s in ok])}")
+    if mode == "stream":
+        print(f"{'first byte':<16}{_ms([s.ttfb for s in ok if s.ttfb is not None])}")
+        print(f"{'first token':<16}{_ms([s.first_token for s in ok if s.first_token is not None])}")
+
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for sample in ok:
+        for stage, seconds in sample.stages.items():
+            stages[stage].append(seconds)
+    for stage, values in sorted(stages.items(), key=lambda item: -np.median(item[1])):
+        print(f"  {stage:<14}{_ms(values)}")
+
+
+def _start(argv: List[str], env: dict, log: Path) -> subprocess.Popen:
+    return subprocess.Popen(argv, env=env, stdout=log.open("w"), stderr=subprocess.STDOUT)
+
+
+def _check_tiktoken() -> None:
+    """
+    The app's OpenAIEmbeddings counts tokens with cl100k_base and downloads it on first use, so
+    without network access every embedding call would fail. Load it here, with the environment the
+    app inherits, and stop early if it is not cached.
+    """
+    import tiktoken
+
+    try:
+        tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        raise SystemExit(
+            f"tiktoken could not load cl100k_base ({e}). Run once with network access, or point "
+            "TIKTOKEN_CACHE_DIR at a directory that already holds it."
+        )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    processes: List[subprocess.Popen] = []
+    logs = Path(tempfile.mkdtemp(prefix="askgenie-bench-"))
+    try:
+        app_url = args.app_url
+        if not app_url:
+            _check_tiktoken()
+            fake_port, app_port = _free_port(), _free_port()
+            fake_url = f"http://127.0.0.1:{fake_port}"
+            fake = _start(
+                [sys.executable, "-m", "benchmarks.fake_services", "--port", str(fake_port),
+                 *profile_to_argv(profile_from_args(args))],
+                dict(os.environ), logs / "fake_services.log",
+            )
+            processes.append(fake)
+            await _wait_healthy(f"{fake_url}/docs", fake)
+
+            env = {
+                **os.environ,
+                "LLM_PROVIDER": "openai",
+                "EMBEDDING_PROVIDER": "openai",
+                "SEARCH_PROVIDER": "serper",
+                "OPENAI_API_KEY": "bench",
+                "SERPER_API_KEY": "bench",
+                "BRAVE_SEARCH_API_KEY": "bench",
+                "OPENAI_BASE_URL": f"{fake_url}/v1",
+                "SERPER_BASE_URL": f"{fake_url}/serper",
+                "BRAVE_BASE_URL": f"{fake_url}/brave",
+                "REQUESTS_PER_MINUTE": "1000000",
+                "USE_FUNCTION_CALLING": "true" if args.tools else "false",
+            }
+            for item in args.app_env:
+                key, _, value = item.partition("=")
+                env[key] = value
+            app_url = f"http://127.0.0.1:{app_port}"
+            app = _start(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                env, logs / "app.log",
+            )
+            processes.append(app)
+            await _wait_healthy(f"{app_url}/health", app)
+            print(f"Stand-ins at {fake_url}, app at {app_url}, logs in {logs}")
+
+        run_id = uuid.uuid4().hex[:8]
+        for mode in args.modes:
+            distinct = args.distinct or args.requests
+            suffix = f" {TOOL_TRIGGER}" if args.tools else ""
+            questions = [f"benchmark {run_id} {mode} question {i % distinct}{suffix}" for i in range(args.requests)]
+            warmup = [f"benchmark {run_id} {mode} warmup {i}{suffix}" for i in range(args.warmup)]
+            if warmup:
+                await _run_mode(mode, app_url, warmup, min(args.concurrency, len(warmup)), args.timeout, args.tools)
+            samples, wall = await _run_mode(mode, app_url, questions, args.concurrency, args.timeout, args.tools)
+            _report(mode, samples, wall)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per mode")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", choices=("json", "stream"), default=["json", "stream"])
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per mode first")
+    parser.add_argument("--distinct", type=int, default=0, help="Cycle through this many questions (0: all distinct)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the app process (repeatable)")
+    parser.add_argument("--tools", action="store_true",
+                        help="Have the model call a tool for every question and check the tool output")
+    parser.add_argument("--app-url", default="", help="Benchmark an already running app instead of starting one")
+    add_profile_arguments(parser)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
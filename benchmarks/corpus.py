@@ -0,0 +1,105 @@
+# benchmarks/corpus.py
+
+"""
+Offline HTML corpus for the scraper/chunker benchmarks.
+
+The bundled pages in benchmarks/corpus/ are small, hand-written samples of common page
+shapes (encyclopedia article, news story, forum thread). Large pages are generated
+deterministically, so runs are reproducible without network access or MBs of fixtures.
+"""
+
+import random
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+# Target sizes of the generated pages, in bytes.
+SYNTHETIC_SIZES = (50_000, 250_000, 1_000_000, 3_000_000, 5_000_000)
+
+_WORDS = (
+    "the of and to in is was for on that with as by at from his her are this which be or an had "
+    "not were but have it they one all their has been would there can more when who will also other "
+    "into time only new some could these two may first then do any like my now over such our man "
+    "me even most made after before between system network energy market policy research data model "
+    "city council transport climate science history language computer software engine search answer "
+    "question result source page cache latency request response server client memory thread process"
+).split()
+
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 24) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + rng.choice([".", ".", ".", "?", "!"])
+
+
+def _paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(3, 7)):
+        sentence = _sentence(rng)
+        roll = rng.random()
+        if roll < 0.15:
+            sentence = f'<a href="/wiki/{rng.choice(_WORDS)}">{sentence}</a>'
+        elif roll < 0.25:
+            sentence = f"<b>{sentence}</b> &amp; <i>{rng.choice(_WORDS)}</i>"
+        parts.append(sentence)
+    return "<p>" + " ".join(parts) + "</p>"
+
+
+def _boilerplate_block(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.3:
+        payload = ",".join(f'"{rng.choice(_WORDS)}": {rng.randint(0, 9999)}' for _ in range(40))
+        return f"<script>window.__STATE__ = {{{payload}}};</script>"
+    if roll < 0.5:
+        return "<!-- " + _sentence(rng) + " -->"
+    if roll < 0.7:
+        return f'<img src="/img/{rng.randint(1, 9999)}.jpg" alt="{_sentence(rng, 3, 6)}">'
+    if roll < 0.85:
+        return f'<iframe src="https://ads.example.com/{rng.randint(1, 999)}"></iframe>'
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{rng.choice(_WORDS)} {rng.randint(1, 999)}</td>" for _ in range(5)) + "</tr>"
+        for _ in range(rng.randint(3, 12))
+    )
+    return f"<table>{rows}</table>"
+
+
+def synthetic_page(size: int, seed: int = 0) -> str:
+    """Build a page of roughly `size` bytes with realistic boilerplate around the content."""
+    rng = random.Random(seed * 1_000_003 + size)
+    css = "\n".join(f".c{i} {{ margin: {i}px; padding: {i % 7}px; }}" for i in range(200))
+    nav = "".join(f'<li><a href="/{w}">{w.title()}</a></li>' for w in rng.sample(_WORDS, 40))
+    head = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{_sentence(rng, 4, 8)}</title><style>{css}</style>"
+        "<script>function track(e){ return fetch('/t', {method: 'POST', body: e}); }</script>"
+        f"</head><body><nav><ul>{nav}</ul></nav><main><article><h1>{_sentence(rng, 4, 8)}</h1>"
+    )
+    tail = "</article></main><footer>" + _paragraph(rng) + "</footer></body></html>"
+
+    parts = [head]
+    total = len(head) + len(tail)
+    while total < size:
+        block = f"<h2>{_sentence(rng, 3, 7)}</h2>" if rng.random() < 0.1 else _paragraph(rng)
+        if rng.random() < 0.25:
+            block += _boilerplate_block(rng)
+        parts.append(block)
+        total += len(block)
+    parts.append(tail)
+    return "".join(parts)
+
+
+def load_corpus(
+    corpus_dir: Optional[Path] = None,
+    sizes: Tuple[int, ...] = SYNTHETIC_SIZES,
+) -> List[Tuple[str, str]]:
+    """
+    Return (name, html) pairs: every *.html file in `corpus_dir` (default: the bundled pages)
+    followed by one generated page per entry in `sizes`.
+    """
+    pages = []
+    for path in sorted((corpus_dir or CORPUS_DIR).glob("*.html")):
+        pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    for size in sizes:
+        pages.append((f"synthetic_{size // 1000}kb", synthetic_page(size)))
+    return pages
@@ -0,0 +1,254 @@
+# benchmarks/fake_services.py
+
+"""
+Local stand-ins for every upstream the answer pipeline calls, with configurable latency.
+
+One server hosts all of them under separate prefixes:
+
+    /v1/chat/completions, /v1/embeddings   OpenAI-compatible (JSON and SSE streaming)
+    /serper/search, /serper/news, ...     Serper
+    /brave/search                          Brave
+    /site/<slug>/<n>.html                  static HTML pages the search results link to
+
+Point the app at it with OPENAI_BASE_URL=<url>/v1, SERPER_BASE_URL=<url>/serper and
+BRAVE_BASE_URL=<url>/brave. Responses are deterministic for a given request, so runs are
+comparable. TOOL_TRIGGER in a question makes the model call search_news: completions echo the
+trigger (so it survives rephrasing) and, when offered tools, call the tool instead of answering.
+
+    python -m benchmarks.fake_services --port 8900
+    python -m benchmarks.fake_services --port 8900 --llm-latency-ms 400 --token-delay-ms 15
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Union
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+from benchmarks.corpus import synthetic_page
+
+_WORDS = (
+    "the search engine answers questions by reading several pages and summarizing what "
+    "they agree on with sources cited for each claim made in the final response"
+).split()
+
+TOOL_TRIGGER = "[tools]"
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated upstream latencies in milliseconds; each call adds uniform jitter on top."""
+
+    llm_ms: float = 300.0
+    token_delay_ms: float = 10.0
+    embed_ms: float = 80.0
+    search_ms: float = 250.0
+    page_ms: float = 150.0
+    jitter_ms: float = 50.0
+    answer_tokens: int = 120
+    embedding_dim: int = 1536
+    page_bytes: int = 60_000
+    results: int = 10
+
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.sha1(json.dumps(parts).encode("utf-8")).digest()[:8], "big")
+
+
+async def _sleep(base_ms: float, jitter_ms: float, rng: random.Random) -> None:
+    await asyncio.sleep((base_ms + rng.uniform(0, jitter_ms)) / 1000)
+
+
+def _text(seed: int, words: int) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(_WORDS) + " " for _ in range(words)]
+
+
+def _vector(item: Union[str, List[int]], dim: int) -> np.ndarray:
+    rng = np.random.default_rng(_seed(item))
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@lru_cache(maxsize=256)
+def _page(slug: str, index: int, size: int) -> str:
+    return synthetic_page(size, seed=_seed(slug, index) % 1_000_000)
+
+
+def _tool_call(body: dict) -> Optional[dict]:
+    """The search_news call the model makes for a TOOL_TRIGGER question, if the request offers tools."""
+    messages = body.get("messages") or []
+    if not body.get("tools") or not messages or TOOL_TRIGGER not in str(messages[-1].get("content", "")):
+        return None
+    arguments = json.dumps({"query": str(messages[-1]["content"])[-200:]})
+    return {"id": "call_fake", "type": "function", "function": {"name": "search_news", "arguments": arguments}}
+
+
+def build_app(profile: LatencyProfile) -> FastAPI:
+    app = FastAPI(title="AskGenie upstream stand-ins")
+    rng = random.Random(0)
+
+    def _results(request: Request, query: str):
+        slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+        base = str(request.base_url).rstrip("/")
+        return [(f"Result {i} for {query}", f"{base}/site/{slug}/{i}.html") for i in range(profile.results)]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-model")
+        tool_call = _tool_call(body)
+        tokens = [] if tool_call else _text(_seed(body.get("messages")), profile.answer_tokens)
+        if not tool_call and TOOL_TRIGGER in json.dumps(body.get("messages")):
+            tokens.insert(0, TOOL_TRIGGER + " ")
+        usage = {"prompt_tokens": 200, "completion_tokens": len(tokens), "total_tokens": 200 + len(tokens)}
+        created = int(time.time())
+        await _sleep(profile.llm_ms, profile.jitter_ms, rng)
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens).strip() or None,
+                                **({"tool_calls": [tool_call]} if tool_call else {})},
+                    "finish_reason": "tool_calls" if tool_call else "stop",
+                }],
+                "usage": usage,
+            })
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def events():
+            for token in tokens:
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if profile.token_delay_ms:
+                    await asyncio.sleep(profile.token_delay_ms / 1000)
+            if tool_call:
+                delta = {"role": "assistant", "tool_calls": [{"index": 0, **tool_call}]}
+                chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": "tool_calls"}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            if include_usage:
+                final = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        await _sleep(profile.embed_ms, profile.jitter_ms, rng)
+
+        data = []
+        for i, item in enumerate(inputs):
+            vector = _vector(item, body.get("dimensions") or profile.embedding_dim)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        return JSONResponse({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    @app.post("/serper/{kind}")
+    async def serper(kind: str, request: Request):
+        body = await request.json()
+        await _sleep(profile.search_ms, profile.jitter_ms, rng)
+        if kind != "search":
+            return JSONResponse({kind: []})
+        return JSONResponse({"organic": [{"title": t, "link": link} for t, link in _results(request, body.get("q", ""))]})
+
+    @app.get("/brave/search")
+    async def brave(request: Request, q: str = "", count: int = 10):
+        await _sleep(profile.search_ms, profile.jitter_ms, rng)
+        results = _results(request, q)[:count]
+        return JSONResponse({"web": {"results": [{"title": t, "url": link} for t, link in results]}})
+
+    @app.get("/site/{slug}/{index}.html")
+    async def site(slug: str, index: int):
+        await _sleep(profile.page_ms, profile.jitter_ms, rng)
+        return HTMLResponse(_page(slug, index, profile.page_bytes))
+
+    return app
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = LatencyProfile()
+    parser.add_argument("--llm-latency-ms", type=float, default=defaults.llm_ms, help="Time to first token")
+    parser.add_argument("--token-delay-ms", type=float, default=defaults.token_delay_ms, help="Between streamed tokens")
+    parser.add_argument("--embed-latency-ms", type=float, default=defaults.embed_ms)
+    parser.add_argument("--search-latency-ms", type=float, default=defaults.search_ms)
+    parser.add_argument("--page-latency-ms", type=float, default=defaults.page_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--answer-tokens", type=int, default=defaults.answer_tokens)
+    parser.add_argument("--page-bytes", type=int, default=defaults.page_bytes)
+
+
+def profile_from_args(args: argparse.Namespace) -> LatencyProfile:
+    return LatencyProfile(
+        llm_ms=args.llm_latency_ms,
+        token_delay_ms=args.token_delay_ms,
+        embed_ms=args.embed_latency_ms,
+        search_ms=args.search_latency_ms,
+        page_ms=args.page_latency_ms,
+        jitter_ms=args.jitter_ms,
+        answer_tokens=args.answer_tokens,
+        page_bytes=args.page_bytes,
+    )
+
+
+def profile_to_argv(profile: LatencyProfile) -> List[str]:
+    return [
+        "--llm-latency-ms", str(profile.llm_ms),
+        "--token-delay-ms", str(profile.token_delay_ms),
+        "--embed-latency-ms", str(profile.embed_ms),
+        "--search-latency-ms", str(profile.search_ms),
+        "--page-latency-ms", str(profile.page_ms),
+        "--jitter-ms", str(profile.jitter_ms),
+        "--answer-tokens", str(profile.answer_tokens),
+        "--page-bytes", str(profile.page_bytes),
+    ]
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(build_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()